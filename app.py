@@ -2,45 +2,28 @@
 
 import streamlit as st
 import pandas as pd
-from pathlib import Path
 from datetime import datetime
 
-st.set_page_config(page_title="MakanSini V2 - Chatbot", page_icon="🍛")
+import catalog
+from catalog import FORM_CSV
 
-# 👇 Change this if you rename your CSV
-CSV_FILE = "Survey on Restaurant around Seri Iskandar (Responses) - Form Responses 1.csv"
+st.set_page_config(page_title="MakanSini V2 - Chatbot", page_icon="🍛")
 
+# This app still reads the raw Google Form export
+CSV_FILE = FORM_CSV
 
 # ==========================
 # Data loading & scoring
 # ==========================
+# one catalog (one row per restaurant) per server process, shared by all
+# sessions; a new catalog version (the CSV changed) gets a new entry
+@st.cache_resource(max_entries=1, show_spinner=False)
+def shared_catalog(version):
+    return catalog.load_restaurants(CSV_FILE)
+
+
 def load_catalog():
-    csv_path = Path(__file__).parent / CSV_FILE
-    df = pd.read_csv(csv_path)
-
-    # Rename to simpler internal names
-    df = df.rename(columns={
-        "Restaurant Name": "name",
-        "Range spending per meal": "spend_range",
-        "Minimum spending per person  (eg: RM5)": "min_spend",
-        "Maximum spending per person (eg: RM15)": "max_spend",
-        "Dining Tag": "dining_tag",
-        "Is this restaurant Halal?": "halal",
-        "Cuisine Tag": "cuisine",
-        "Operating Hours (eg: 8.00am - 3.00pm)": "hours",
-        "Operating Days": "days",
-        "Travel time from UTP (in mins, eg: 6 mins)": "travel_mins",
-        "Location/Area": "location",
-        "Rating": "rating",
-    })
-
-    # Convert numeric columns
-    for col in ["min_spend", "max_spend", "travel_mins", "rating"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    df = df.dropna(subset=["name"])
-    return df
+    return shared_catalog(catalog.catalog_version(CSV_FILE))
 
 
 def filter_open_today(df):
@@ -254,12 +237,17 @@ def parse_preferences(raw_answers):
     return prefs
 
 
+# the result page is redrawn on every rerun; only score each answer set once a day
+@st.cache_data(max_entries=256, show_spinner=False)
+def top_recommendations(prefs, weekday, version, n=3):
+    return score_restaurants(shared_catalog(version), prefs, only_open_today=True).head(n)
+
+
 def show_recommendations():
     st.markdown(" 🍽 Here are your recommendations:")
 
-    df = load_catalog()
     prefs = parse_preferences(st.session_state.answers)
-    ranked_df = score_restaurants(df, prefs, only_open_today=True)
+    ranked_df = top_recommendations(prefs, datetime.today().weekday(), catalog.catalog_version(CSV_FILE))
 
     if ranked_df.empty:
         st.warning(
@@ -339,29 +327,7 @@ def show_recommendations():
 # ==========================
 def cuisine_exists(user_text: str) -> bool:
     """Check if the typed cuisine appears in the dataset at all."""
-    df = load_catalog()
-    text = (user_text or "").strip()
-    if not text:
-        return False
-    mask = df["cuisine"].astype(str).str.contains(text, case=False, na=False)
-    return mask.any()
-
-
-def is_number(text: str) -> bool:
-    """Return True if text can be converted to a float."""
-    try:
-        float(text)
-        return True
-    except Exception:
-        return False
-def cuisine_exists(user_text: str) -> bool:
-    """Check if the typed cuisine appears in the dataset at all."""
-    df = load_catalog()
-    text = (user_text or "").strip()
-    if not text:
-        return False
-    mask = df["cuisine"].astype(str).str.contains(text, case=False, na=False)
-    return mask.any()
+    return catalog.get_vocabulary(CSV_FILE).has_cuisine(user_text)
 
 
 def is_number(text: str) -> bool:
@@ -374,6 +340,7 @@ def is_number(text: str) -> bool:
 
 
 def main():
+    catalog.watch_catalog(CSV_FILE)  # hot reload when the export is replaced
     st.title("🍛 MakanSini V2 – Chatbot")
     st.caption("Chat with the bot and get 3 restaurant suggestions that match you and are open today.")
 
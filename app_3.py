@@ -1,10 +1,19 @@
-import re
-from pathlib import Path
+import json
+import os
+import uuid
+from collections import namedtuple
 from datetime import datetime
+from pathlib import Path
 
-import pandas as pd
+import numpy as np
 import streamlit as st
 
+import profiling
+import timings
+from catalog import reload_stats, restaurants_snapshot, watch_catalog
+from engine import MAX_RESULTS, parse_one_shot, rank_restaurants, warm_up
+from scoring import ranked_frame
+
 st.set_page_config(page_title="MakanSini V3 - One-shot Chatbot", page_icon="🍜")
 
 # ==========================
@@ -20,503 +29,27 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ==========================
-# Data loading & scoring
+# Streamlit caches
 # ==========================
+# Shared by every session of this server process. Keyed on the catalog
+# version, so a changed CSV gets a fresh entry. (Rankings are cached below
+# Streamlit, in ranking_cache, so server.py shares them too.)
 
-CSV_FILE = "Survey on Restaurant around Seri Iskandar (Responses) - Clean Version.csv"
-
-
-def load_catalog():
-    csv_path = Path(__file__).parent / CSV_FILE
-    df = pd.read_csv(csv_path)
-
-    df = df.rename(columns={
-        "Restaurant Name": "name",
-        "Range (min - max)": "spend_range",
-        "Minimum spending per person (RM)": "min_spend",
-        "Maximum spending per person (RM)": "max_spend",
-        "Dining tag": "dining_tag",
-        "Halal Status": "halal",
-        "Cuisine Tag": "cuisine",
-        "Operating Hours": "hours",
-        "Operating Days": "days",
-        "Travel Time from UTP": "travel_mins",
-        "Location/Area": "location",
-        "Rating": "rating",
-    })
-
-# Cleaning Rows With Numbers
-    for col in ["min_spend", "max_spend", "travel_mins", "rating"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-# Drop Rows W/O Names
-    df = df.dropna(subset=["name"])
-    return df
-
-
-# Drop Restaurants not open today from df
-def filter_open_today(df):
-    today_name = datetime.today().strftime("%A")
-    return df[df["days"].astype(str).str.contains(today_name, case=False, na=False)]
-
-
-# Vectorised Scoring Method - Score every row simultaneously without loop
-def score_restaurants(df, preferences, only_open_today=True, debug_mode=False):
-
-    if df.empty:
-        return df
-
-    df = df.copy()
-    df["score"] = 0
-
-    # initialise per-aspect score columns (debug purposes)
-    df["score_cuisine"] = 0.0
-    df["score_budget"] = 0.0
-    df["score_travel"] = 0.0
-    df["score_meal"] = 0.0
-    df["score_halal"] = 0.0
-    df["score_location"] = 0.0
-    df["score_rating"] = 0.0
-
-    # unpack user preferences
-    cuisine_pref = preferences.get("cuisine") or ""
-    cuisine_list = preferences.get("cuisines") or []
-    meal_type = preferences.get("meal_type") or ""
-    halal_pref = preferences.get("halal_pref") or ""
-    location_pref = preferences.get("location_pref") or ""
-    max_budget = preferences.get("max_budget")
-    budget_level = preferences.get("budget_level")
-    max_travel = preferences.get("max_travel")
-    # detect if user wants dessert
-    user_wants_dessert = any(
-        c.lower() == "dessert" for c in cuisine_list
-    ) or ("dessert" in cuisine_pref.lower())
-
-    # buang smua restos not open today
-    if only_open_today:
-        df = filter_open_today(df)
-
-    # ------------ CUISINE SCORING -------------------
-    if cuisine_list:
-        pattern = "|".join(re.escape(c) for c in cuisine_list)
-        mask_cuisines = df["cuisine"].astype(str).str.contains(pattern, case=False, na=False)
-        df.loc[mask_cuisines, "score_cuisine"] += 40
-
-    elif cuisine_pref:
-        mask_cuisine = df["cuisine"].astype(str).str.contains(cuisine_pref, case=False, na=False)
-        df.loc[mask_cuisine, "score_cuisine"] += 40
-
-    # penalise dessert place if the user did not mention dessert 
-    if not user_wants_dessert and meal_type in ["Breakfast", "Lunch", "Dinner"]:
-        cuisine_lower = df["cuisine"].astype(str).str.lower()
-
-        # dessert-only or dessert-focused: has "dessert" but not main meals
-        dessert_only = (
-            cuisine_lower.str.contains("dessert", na=False)
-            & ~cuisine_lower.str.contains("malay|nasi campur|western|mamak|indian|arabic|thai|fast food", na=False)
-        )
-
-        # reduce their cuisine score so they won’t be recommended unless everything else is really bad
-        df.loc[dessert_only, "score_cuisine"] -= 25
-
-    # ------------ BUDGET SCORING --------------------
-    if max_budget is not None:
-        min_spend_col = df["min_spend"]
-        max_spend_col = df["max_spend"]
-
-        # Valid rows where both min and max are known
-        valid = min_spend_col.notna() & max_spend_col.notna()
-
-        # Budget Tiering
-        # 1) Fully in budget: entire range is <= budget
-        fully_in_budget = valid & max_spend_col.le(max_budget)
-        # 2) Partially in budget: cheapest item is affordable, but some items are above budget
-        partially_in_budget = valid & ~fully_in_budget & min_spend_col.le(max_budget)
-        # 3) Over budget: even the cheapest option is above budget
-        over_budget = valid & ~fully_in_budget & ~partially_in_budget
-
-        # Reward/Penalise tiers
-        df.loc[fully_in_budget, "score_budget"] += 30  # best match
-        df.loc[partially_in_budget, "score_budget"] += 15  # okay
-        df.loc[over_budget, "score_budget"] -= 10  # should not be recommended
-        # Under budget penalty
-        if budget_level == "expensive":
-            # Very cheap places compared to user budget: max_spend <= 0.5 * budget
-            very_cheap = valid & max_spend_col.le(max_budget * 0.5)
-
-            # Slightly cheap but still okay: between 0.5 and 0.8 of budget
-            mid_price = valid & ~very_cheap & max_spend_col.le(max_budget * 0.8)
-
-            # Penalise very cheap strongly, mildly penalise mid-price
-            df.loc[very_cheap, "score_budget"] -= 20
-            df.loc[mid_price, "score_budget"] -= 5
-
-    # ------------ MEALTYPE SCORING -------------------------
-    if meal_type and meal_type.lower() != "any":
-        mask_meal = df["dining_tag"].astype(str).str.contains(meal_type, case=False, na=False)
-        df.loc[mask_meal, "score_meal"] += 15
-
-    # ------------------- TRAVEL SCORING -------------------------
-    if max_travel is not None:
-        df["score_travel"] += df["travel_mins"].le(max_travel) * 10
-
-    # ------------------- HALAL SCORING -------------------------
-    if halal_pref:
-        halal_col = df["halal"].astype(str).str.lower()
-        if halal_pref.lower() == "halal only":
-            df.loc[halal_col.str.contains("yes", na=False), "score_halal"] += 10
-            df.loc[~halal_col.str.contains("yes", na=False), "score_halal"] -= 20
-
-    # --------------------- LOCATION SCORING -------------------
-    if location_pref and location_pref.lower() != "any":
-        loc_series = df["location"].astype(str)
-
-        # semua yang ~Inside UTP considered "outside"
-        mask_inside = loc_series.str.contains("Inside UTP", case=False, na=False)
-        mask_outside = ~mask_inside
-
-        if location_pref == "Outside UTP":
-            # Reward every restos outside UTP
-            df.loc[mask_outside, "score_location"] += 20
-            # penalise every restos Inside UTP if user explicitly said outside
-            df.loc[mask_inside, "score_location"] -= 10
-
-        elif location_pref == "Inside UTP":
-            # Penalise every restos outside UTP
-            df.loc[mask_outside, "score_location"] -= 10
-            # Reward every restos Inside UTP if user explicitly said outside
-            df.loc[mask_inside, "score_location"] += 20
-
-        else:
-            # Normal case: reward exact match to the preferred location
-            mask_loc = loc_series.str.contains(location_pref, case=False, na=False)
-            df.loc[mask_loc, "score_location"] += 30
-
-    # ------------------------ RATING SCORING -------------------
-    df["score_rating"] += df["rating"].fillna(0) * 2
-
-    # ----------------------ADD ALL SCORES ----------------------
-    df["score"] = (
-            df["score_cuisine"]
-            + df["score_budget"]
-            + df["score_travel"]
-            + df["score_meal"]
-            + df["score_halal"]
-            + df["score_location"]
-            + df["score_rating"]
-    )
-
-    df = df.sort_values("score", ascending=False) # top of list score highest
-
-    if debug_mode:
-        # return full debug info (you'll show selected columns in Streamlit)
-        return df
-    else:
-        # for normal usage, maybe just return with score
-        return df
-
-
-# ==========================
-# Parsing helpers
-# ==========================
-
-# ====== location helpers and dictionary ==================
-def get_known_locations():
-    df = load_catalog()
-    locations = {
-        str(loc).strip()
-        for loc in df["location"].dropna()
-        if str(loc).strip()
-    }
-    return sorted(locations)
-
-
-LOCATION_SYNONYMS = {
-    "Inside UTP": [
-        "inside utp", "dalam utp", "in utp", "within utp",
-        "dalam kampus", "inside campus", "inside"
-    ],
-    "Tronoh": [
-        "tronoh", "trono", "teronoh"
-    ],
-    "Bandar Universiti": [
-        "bandar universiti", "bandar uni", "bdr uni", "bu", "lotus"
-    ],
-    "Outside UTP": [
-        "town", "luar", "outside", "out"
-    ],
-    "SIBC": [
-        "sibc", "si", "seri iskandar", "billion"
-    ]
-}
-
-
-def normalize_location_text(text):
-    t = text.lower()
-    for canonical, syns in LOCATION_SYNONYMS.items():
-        for s in syns:
-            pattern = r"\b" + re.escape(s) + r"\b"
-            t = re.sub(pattern, canonical.lower(), t)
-
-    return t.lower()
-
-
-def pick_location(text):
-    t = normalize_location_text(text)
-    t_no_punc = re.sub(r"[^\w\s]", " ", t)
-
-    if "outside utp" in t_no_punc:
-        return "Outside UTP"
-
-    for loc in get_known_locations():
-        if loc and loc.lower() in t_no_punc:
-            return loc
-
-    return "Any"
-# =====================================================
-
-# ======== Budget Helpers and Dictionaries ============
-
-
-BUDGET_SYNONYMS = {
-    "cheap": [
-        "cheap", "murah", "bajet", "budget sikit",
-        "taknak mahal", "tak nak mahal", "not expensive",
-        "jimat", "low budget", "affordable", "ekonomi", "rahmah"
-    ],
-    "medium": [
-        "medium", "average", "sederhana", "mid-range", "mid range",
-        "normal price", "biasa", "reasonable"
-    ],
-    "expensive": [
-        "expensive", "mahal", "high end", "mahal sikit",
-        "premium", "luxury", "boujee"
-    ]
-}
-
-BUDGET_VALUES = {
-    "cheap": 10.0,
-    "medium": 15.0,
-    "expensive": 25.0
-}
-
-
-def pick_budget_level(text: str):
-    t = text.lower()
-    for level, syns in BUDGET_SYNONYMS.items():
-        if any(s in t for s in syns):
-            return level
-
-    m_num = re.search(r"(?:rm\s*|budget\s*|under\s*|below\s*)?(\d+)", t)
-    if m_num:
-        amount = float(m_num.group(1))
-        if amount >= 30:
-            return "expensive"
-
-    return None
-
-
-def pick_budget(text):
-    t = text.lower()
-
-    for category, syns in BUDGET_SYNONYMS.items():
-        if any(s in t for s in syns):
-            return BUDGET_VALUES[category]
-
-    rm_match = re.search(r"rm\s*(\d+)", t)
-    if rm_match:
-        return float(rm_match.group(1))
-
-    nearby_match = re.search(
-        r"(under|below|bawah|max|budget)\s*(rm)?\s*(\d+(?:\.\d+)?)\b(?!\s*(min|mins|minute|minutes))", t)
-    if nearby_match:
-        return float(nearby_match.group(3))
-
-    more_malay = re.search(r"(bawah|taknak lebih|tak nak lebih|jangan lebih|around|sekitar)\s*(rm)?\s*(\d+)", t)
-    if more_malay:
-        return float(more_malay.group(3))
-
-    ringgit_match = re.search(r"\b(\d+(?:\.\d+)?)\b\s*(ringgit)\b", t)
-    if ringgit_match:
-        return float(ringgit_match.group(1))
-
-    return None
-# =======================================================
-
-# ================ Cuisine ==============================
-
-
-def get_known_cuisines():
-    df = load_catalog()
-    cuisines = set()
-    for raw in df["cuisine"].dropna():
-        for part in re.split(r"[,/;]", str(raw)):
-            cuisines.add(part.strip())
-    return sorted([c for c in cuisines if c])
-
-
-CUISINE_SYNONYMS = {
-
-    "Malay": [
-        "melayu", "masakan melayu", "nasi lemak",
-        "lauk melayu", "lauk kampung", "kampung style",
-        "masakan kampung", "ayam masak merah", "asam pedas",
-        "nasi goreng kampung", "ikan keli", "ikan bawal", "sambal",
-        "nasi", "nasi goreng"
-    ],
-
-    "Chinese": [
-        "cina", "chinese", "char kuey teow", "ckt",
-        "dim sum", "wantan", "wonton", "claypot", "fried rice chinese",
-        "kongfu", "kung fu", "mee", "kuey teow"
-    ],
-
-    "Mamak": [
-        "mamak", "nasi kandar", "roti canai", "roti telur",
-        "roti tampal", "maggi goreng", "mee goreng mamak",
-        "teh tarik", "nasi goreng", "mee", "mee goreng"
-        "maggi"
-    ],
-
-    "Indian": [
-        "indian", "india", "biryani", "briyani", "tandoori",
-        "naan", "butter chicken", "masala", "dhal"
-    ],
-
-    "Korean": [
-        "korean", "korea", "kimchi", "ramyeon", "ramyun",
-        "tteokbokki", "kimbap", "jajangmyeon", "buldak"
-    ],
-
-    "Japanese": [
-        "japanese", "japan", "jepun", "sushi", "ramen",
-        "donburi", "bento", "tempura", "udon"
-    ],
-
-    "Fast Food": [
-        "kfc", "mcd", "mcD", "burger king", "a&w", "texas",
-        "marrybrown", "pizza", "dominos", "subway",
-        "fast food", "burger"
-    ],
-
-    "Nasi Campur": [
-        "nasi campur", "lauk campur", "mixed rice", "economy rice",
-        "kedai campur", "nasi berlauk", "lauk", "nasi"
-    ],
-
-    "Thailand": [
-        "thai", "tomyam", "tom yam", "paprik",
-        "pad kra pao", "thai food", "kerabu maggi",
-        "somtam", "nasi goreng", "siam", "kuey teow",
-        "maggi"
-    ],
-
-    "Arabic": [
-        "arab", "arabic", "mandy", "mandi", "kabsah",
-        "kebab", "shawarma", "hummus"
-    ],
-
-    "Dessert": [
-        "dessert", "aiskrim", "ice cream", "cendol",
-        "bingsu", "kek", "cake", "brownies", "pancake"
-    ],
-
-    "Beverage": [
-        "drink", "beverage", "minum", "coffee", "kopi",
-        "tea", "teh", "milkshake", "smoothie", "frappe",
-        "boba", "bubble tea", "ngopi"
-    ],
-
-    "Western": [
-        "western", "chicken chop", "lamb chop", "steak",
-        "fries", "fish and chips", "pasta", "spaghetti",
-        "carbonara", "bolognese", "lasagna", "grilled chicken"
-    ],
-
-    "Indonesian": ["indo", "gepuk", "bakso", "penyet", "nasi padang"],
-
-}
-
-
-
-def pick_cuisine(text):  # update from raja punya to allow multiple cuisine choices
-    t = text.lower()
-    c_intext = []
-
-    for category, syns in CUISINE_SYNONYMS.items():
-        if any(cat in t for cat in syns):
-            c_intext.append(category)
-
-    for c in get_known_cuisines():
-        c_low = c.lower()
-        if c_low and c_low in t:
-            c_intext.append(c)
-
-    seen = set()
-    unique = []  # handle dupes e.g. "mamak nasi campur mamak kat SI" return ["Mamak", "Nasi Campur"]
-    for c in c_intext:
-        if c not in seen:
-            seen.add(c)
-            unique.append(c)
-
-    return unique  # may be [] if nothing found
-# =====================================================
-
-# ========== Pick Meal Helpers and Dict ===============
-
-
-MEALTYPE_SYNONYMS = {
-    "Breakfast": ["pagi", "sarapan", "bfast", "breakfast", "breakie"],
-    "Lunch": ["tengahari", "lunch", "afternoon", "noon"],
-    "Tea Time": ["petang", "ptg", "tea", "tea time", "hi tea", "hi-tea", "snack"],
-    "Dinner": ["malam", "mlm", "dinner", "supper", "night"]
-}
-
+@st.cache_resource(max_entries=1, show_spinner=False)
+def warmed_up(version):
+    """Build the scoring arrays and parser matchers once per catalog version."""
+    warm_up()
 
-def pick_meal_type(t):
-    t = t.lower()
 
-    for category, syns in MEALTYPE_SYNONYMS.items():
-        if any(s in t for s in syns):
-            return category
+def shared_catalog():
+    """
+    (version, one row per restaurant) from the same catalog entry, with
+    everything a query needs already built.
+    """
+    version, df = restaurants_snapshot()
+    warmed_up(version)
+    return version, df
 
-    return "Any"
-# =====================================================
-
-# ================= Halal Pref ========================
-
-
-def pick_halal_pref(t):
-    t = t.lower()
-    if "halal" in t: return "Halal only"
-    return "-"
-# ====================================================
-
-# ================= Travel Time Pref =================
-
-
-def pick_travel(t):
-    t = t.lower()
-    m = re.search(r"(\d+)\s*(min|mins|minute)", t)
-    return float(m.group(1)) if m else None
-# ===================================================
-
-# ========== Call all pick fx =======================
-
-
-def parse_one_shot(t):
-    cuisines = pick_cuisine(t)
-    return {
-        "cuisine": cuisines[0] if cuisines else None,
-        "cuisines": cuisines,
-        "max_budget": pick_budget(t),
-        "budget_level": pick_budget_level(t),
-        "meal_type": pick_meal_type(t),
-        "max_travel": pick_travel(t),
-        "halal_pref": pick_halal_pref(t),
-        "location_pref": pick_location(t),
-    }
-# ===================================================
 
 # =============== Produce Summary ===================
 
@@ -544,12 +77,55 @@ def init_session():
         ]
 
 
+# Long chats: only the last CHAT_WINDOW messages get their own bubble, the
+# rest are folded into one expander. At most MAX_STORED_MESSAGES stay in
+# the session; older ones are dropped, or appended to
+# <MAKANSINI_CHAT_SPILL_DIR>/<chat id>.jsonl when that env var is set.
+CHAT_WINDOW = 8
+MAX_STORED_MESSAGES = 40
+CHAT_SPILL_DIR = os.environ.get("MAKANSINI_CHAT_SPILL_DIR")
+
+
+def spill_messages(messages):
+    if not CHAT_SPILL_DIR:
+        return
+    chat_id = st.session_state.setdefault("chat_id", uuid.uuid4().hex)
+    path = Path(CHAT_SPILL_DIR) / f"{chat_id}.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        for msg in messages:
+            f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+
+
 def add_message(role, text, small=False):
-    st.session_state.messages.append({"role": role, "text": text, "small": small})
+    messages = st.session_state.messages
+    messages.append({"role": role, "text": text, "small": small})
+    if len(messages) > MAX_STORED_MESSAGES:
+        overflow = len(messages) - MAX_STORED_MESSAGES
+        spill_messages(messages[:overflow])
+        del messages[:overflow]
+        st.session_state["dropped_messages"] = st.session_state.get("dropped_messages", 0) + overflow
 
 
+@timings.timed("render_chat")
 def render_chat():
-    for msg in st.session_state.messages:
+    messages = st.session_state.messages
+    older, recent = messages[:-CHAT_WINDOW], messages[-CHAT_WINDOW:]
+    dropped = st.session_state.get("dropped_messages", 0)
+
+    if older or dropped:
+        with st.expander(f"Earlier messages ({len(older) + dropped})"):
+            if dropped:
+                st.caption(f"{dropped} older messages are no longer kept in this session.")
+            st.markdown(
+                "<hr>".join(
+                    f"<div class='chat-message'><b>{'MakanSini' if m['role'] == 'assistant' else 'You'}:</b> {m['text']}</div>"
+                    for m in older
+                ),
+                unsafe_allow_html=True,
+            )
+
+    for msg in recent:
         role = "assistant" if msg["role"] == "assistant" else "user"
         with st.chat_message(role):
             st.markdown(f"<div class='chat-message'>{msg['text']}</div>", unsafe_allow_html=True)
@@ -557,14 +133,65 @@ def render_chat():
 
 def reset_session():
     st.session_state.pop("messages", None)
+    st.session_state.pop("dropped_messages", None)
     st.rerun()
 
+
+# The last ranking is kept per session only for the debug table, so store
+# row positions + component scores (the catalog itself is shared) and
+# rebuild the table from the catalog when it is shown.
+LastRanking = namedtuple("LastRanking", ["version", "positions", "components"])
+
+
+def slim_ranking(version, positions, comps):
+    return LastRanking(version, positions.astype(np.int32), comps.astype(np.float32, copy=True))
+
+
+def last_ranking_bytes(record):
+    return record.positions.nbytes + record.components.nbytes
+
+
+def debug_table(record):
+    """The ranked rows with score columns, or None if the catalog has changed since."""
+    version, df = shared_catalog()
+    if record.version != version:
+        return None
+    return ranked_frame(df, record.positions, record.components.sum(axis=1), record.components)
+
 # ==========================
 # Main
 # ==========================
 
+DEBUG_ROWS = 25  # rows in the score breakdown table
+
+
+def show_timings():
+    on = st.checkbox("⏱ Record stage timings (whole server)", value=timings.enabled())
+    if on != timings.enabled():
+        timings.enable(on)
+    stats = timings.percentiles()
+    if stats:
+        st.dataframe([{"stage": name, **s} for name, s in stats.items()])
+    elif on:
+        st.caption("No timings yet, send a message.")
+
+
+def show_profiling():
+    st.checkbox("🧪 Profile my next messages (cProfile)", key="profile_turns")
+    for path in profiling.recent()[-3:]:
+        st.caption(f"{path} (+ .collapsed)")
+
 
 def main():
+    # one script run is one turn; its stage timings are logged together, and
+    # it is profiled when sampled (MAKANSINI_PROFILE) or asked for in debug mode
+    force_profile = st.session_state.get("profile_turns", False)
+    with profiling.profile_turn("app_3", force=force_profile), timings.turn("app_3"):
+        chat_turn()
+
+
+def chat_turn():
+    watch_catalog()  # reload the CSV in the background when it changes (once per process)
     st.title("🍜 MakanSini V3 – One-shot Chatbot")
     st.caption("Powered by natural-language processing.")
 
@@ -611,15 +238,29 @@ def main():
 
     # 3) If we have previous results and debug is ON, show them
     if debug_mode and st.session_state["last_ranked"] is not None:
-        ranked = st.session_state["last_ranked"]
+        record = st.session_state["last_ranked"]
         st.subheader("🔎 Full Score Breakdown (Debug Mode)")
-        debug_cols = [
-            "name", "cuisine", "location",
-            "score",
-            "score_cuisine", "score_budget", "score_travel",
-            "score_meal", "score_halal", "score_location", "score_rating"
-        ]
-        st.dataframe(ranked[debug_cols].head(25))
+        st.caption(f"Ranking stored for this session: {last_ranking_bytes(record):,} bytes")
+        catalog_info = reload_stats()
+        if catalog_info.get("reload_ms") is not None:
+            st.caption(
+                f"Catalog: {catalog_info['rows']} rows, loaded {catalog_info['loaded_at']} "
+                f"in {catalog_info['reload_ms']:.0f} ms"
+            )
+        ranked = debug_table(record)
+        if ranked is None:
+            st.info("The restaurant list was updated since your last answer, ask again to see the breakdown.")
+        else:
+            debug_cols = [
+                "name", "cuisine", "location",
+                "score",
+                "score_cuisine", "score_budget", "score_travel",
+                "score_meal", "score_halal", "score_location", "score_rating"
+            ]
+            st.dataframe(ranked[debug_cols].head(DEBUG_ROWS))
+    if debug_mode:
+        show_timings()
+        show_profiling()
 
     # 4) Chat input is ALWAYS at the bottom
     text = st.chat_input("Tell me what you're craving...")
@@ -651,40 +292,47 @@ def main():
 
     add_message("assistant", "Here’s what I understood:<br><br>" + prefs_summary(prefs))
 
-    df = load_catalog()
-    ranked = score_restaurants(df, prefs, only_open_today=True, debug_mode=True)
+    with timings.stage("catalog_load"):
+        version, df = shared_catalog()
+    with timings.stage("score_restaurants"):
+        positions, totals, comps = rank_restaurants(
+            df, prefs, open_at_time=datetime.now(), top_k=max(MAX_RESULTS, DEBUG_ROWS)
+        )
+        ranked = ranked_frame(df, positions, totals, comps)
 
     if ranked.empty:
         add_message(
             "assistant",
-            "Hmm… no restaurants matched <b>and</b> are open today 😔<br>"
+            "Hmm… no restaurants matched <b>and</b> are open right now 😔<br>"
             "Try increasing distance or budget."
         )
         st.session_state["last_ranked"] = None
         st.rerun()
 
     # ----------------- OPTIONAL RECS + THRESHOLD -----------------
-    # 1) Get top score
-    top_score = ranked["score"].iloc[0]
+    with timings.stage("select_results"):
+        # 1) Get top score
+        top_score = ranked["score"].iloc[0]
 
-    # 2) Define how far from top we still consider "relevant"
-    THRESHOLD_DIFF = 15
+        # 2) Define how far from top we still consider "relevant"
+        THRESHOLD_DIFF = 15
 
-    # Keep only restos with score within THRESHOLD_DIFF of the best one
-    close_enough = ranked[ranked["score"] >= top_score - THRESHOLD_DIFF]
+        # Keep only restos with score within THRESHOLD_DIFF of the best one
+        close_enough = ranked[ranked["score"] >= top_score - THRESHOLD_DIFF]
 
-    # cap at max 3 results
-    results_to_show = close_enough.head(3)
+        # cap at max 3 results
+        results_to_show = close_enough.head(MAX_RESULTS)
 
-    if results_to_show.empty:
-        results_to_show = ranked.head(1)
+        if results_to_show.empty:
+            results_to_show = ranked.head(1)
 
     # suggestion output
     lines = ["Here are some suggestions for you 👇<br><br>"]
     for _, row in results_to_show.iterrows():
+        reviews = f" ({row['responses']} reviews)" if row["responses"] > 1 else ""
         lines.append(
             f"<b>{row['name']}</b> ({row['cuisine']})<br>"
-            f"💸 RM{row['min_spend']} - RM{row['max_spend']} | ⭐ {row['rating']}<br>"
+            f"💸 RM{row['min_spend']} - RM{row['max_spend']} | ⭐ {row['rating']:.1f}{reviews}<br>"
             f"📍 {row['location']} | ⏱ {row['travel_mins']} minutes<br>"
             f"🕌 Halal: {row['halal']}<br>"
             f"🕒 {row['hours']}<br>"
@@ -695,7 +343,7 @@ def main():
     add_message("assistant", "<br>".join(lines))
 
     # store latest ranking for debug display on next run
-    st.session_state["last_ranked"] = ranked
+    st.session_state["last_ranked"] = slim_ranking(version, positions, comps)
 
     # trigger rerun so new messages + debug can be rendered at top
     st.rerun()
@@ -1,12 +1,12 @@
 # app_v3.py  — One-shot chat mode (FULL FIXED VERSION)
 
 import re
-from pathlib import Path
 from datetime import datetime
 
-import pandas as pd
 import streamlit as st
 
+import catalog
+
 st.set_page_config(page_title="MakanSini V3 - One-shot Chatbot", page_icon="🍜")
 
 # ==========================
@@ -25,33 +25,20 @@ st.markdown("""
 # Data loading & scoring
 # ==========================
 
-CSV_FILE = "Survey on Restaurant around Seri Iskandar (Responses) - Clean Version.csv"
+# one catalog (one row per restaurant) per server process, shared by all sessions
+@st.cache_resource(max_entries=1, show_spinner=False)
+def shared_catalog(version):
+    return catalog.load_restaurants()
 
 
 def load_catalog():
-    csv_path = Path(__file__).parent / CSV_FILE
-    df = pd.read_csv(csv_path)
-
-    df = df.rename(columns={
-        "Restaurant Name": "name",
-        "Range (min - max)": "spend_range",
-        "Minimum spending per person (RM)": "min_spend",
-        "Maximum spending per person (RM)": "max_spend",
-        "Dining tag": "dining_tag",
-        "Halal Status": "halal",
-        "Cuisine Tag": "cuisine",
-        "Operating Hours": "hours",
-        "Operating Days": "days",
-        "Travel Time from UTP": "travel_mins",
-        "Location/Area": "location",
-        "Rating": "rating",
-    })
-
-    for col in ["min_spend", "max_spend", "travel_mins", "rating"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    df = df.dropna(subset=["name"])
-    return df
+    return shared_catalog(catalog.catalog_version())
+
+
+# ranked once per (prefs, weekday, catalog version) across all sessions
+@st.cache_data(max_entries=256, show_spinner=False)
+def top_recommendations(prefs, weekday, version, n=3):
+    return score_restaurants(shared_catalog(version), prefs, True).head(n)
 
 
 def filter_open_today(df):
@@ -295,8 +282,7 @@ def main():
 
     add_message("assistant", "Here’s what I understood:<br><br>" + prefs_summary(prefs))
 
-    df = load_catalog()
-    ranked = score_restaurants(df, prefs, True)
+    ranked = top_recommendations(prefs, datetime.today().weekday(), catalog.catalog_version())
 
     if ranked.empty:
         add_message("assistant",
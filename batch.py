@@ -0,0 +1,142 @@
+# batch.py
+
+"""
+Streaming batch recommender.
+
+Reads queries from a file or stdin, one per line: plain text, or a JSON
+object {"id": ..., "text": "..."} / {"id": ..., "prefs": {...}}. Writes
+one JSON line per query, in input order:
+
+    {"id": ..., "prefs": {...}, "results": [top k with components],
+     "timings": {"parse_ms": ..., "rank_ms": ...}}
+
+Queries are handed to a process pool in chunks; every worker loads the
+catalog once at start-up, and only a fixed number of chunks are in flight,
+so memory stays flat however long the input is.
+
+    python batch.py queries.txt --k 5 > results.jsonl
+    cat queries.jsonl | python batch.py - --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from engine import MAX_RESULTS, parse_one_shot, top_k_records, warm_up
+
+CHUNK_SIZE = 64
+CHUNKS_PER_WORKER = 2  # in flight per worker; bounds memory
+
+
+def _read_query(number, line):
+    line = line.strip()
+    if not line.startswith("{"):
+        return {"id": number, "text": line}
+    query = json.loads(line)
+    if not isinstance(query, dict):
+        raise ValueError("JSON query must be an object")
+    query.setdefault("id", number)
+    return query
+
+
+def run_query(number, line, k, only_open_today, open_at_time):
+    try:
+        query = _read_query(number, line)
+    except Exception as e:  # unreadable line: only its number identifies it
+        return {"id": number, "error": repr(e)}
+    try:
+        t0 = time.perf_counter()
+        if "prefs" in query:
+            prefs = query["prefs"]
+        elif isinstance(query.get("text"), str):
+            prefs = parse_one_shot(query["text"])
+        else:
+            raise ValueError("query needs a 'text' string or a 'prefs' object")
+        t1 = time.perf_counter()
+        results = top_k_records(prefs, k, only_open_today, open_at_time)
+        t2 = time.perf_counter()
+    except Exception as e:  # one bad query must not stop the batch
+        return {"id": query["id"], "error": repr(e)}
+    return {
+        "id": query["id"],
+        "prefs": prefs,
+        "results": results,
+        "timings": {"parse_ms": (t1 - t0) * 1000, "rank_ms": (t2 - t1) * 1000},
+    }
+
+
+def run_chunk(numbered_lines, k, only_open_today, open_at_time):
+    """Worker entry point: JSON-encoded result lines for one chunk."""
+    return [
+        json.dumps(run_query(n, line, k, only_open_today, open_at_time), ensure_ascii=False)
+        for n, line in numbered_lines
+    ]
+
+
+def _chunks(lines, size):
+    numbered = ((n, line) for n, line in enumerate(lines, start=1) if line.strip())
+    while True:
+        chunk = list(islice(numbered, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream(lines, out, k=MAX_RESULTS, only_open_today=True, open_at_time=None,
+           workers=None, chunk_size=CHUNK_SIZE):
+    """Score every query in `lines` and write result lines to `out`; returns the count."""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * CHUNKS_PER_WORKER
+    count = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up) as pool:
+        pending = deque()
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(pool.submit(run_chunk, chunk, k, only_open_today, open_at_time))
+            if len(pending) >= max_in_flight:
+                count += _write(pending.popleft().result(), out)
+        while pending:
+            count += _write(pending.popleft().result(), out)
+    return count
+
+
+def _write(result_lines, out):
+    out.write("\n".join(result_lines) + "\n")
+    out.flush()
+    return len(result_lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", default="-", help="query file, or - for stdin")
+    parser.add_argument("--out", default="-", help="output JSONL file, or - for stdout")
+    parser.add_argument("--k", type=int, default=MAX_RESULTS, help="results per query")
+    parser.add_argument("--open-at", help="ISO datetime; keep only restaurants open then")
+    parser.add_argument("--any-day", action="store_true", help="ignore opening days and hours")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    open_at_time = datetime.fromisoformat(args.open_at) if args.open_at else None
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        count = stream(src, dst, args.k, not args.any_day, open_at_time, args.workers, args.chunk_size)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - started
+    print(f"{count} queries in {elapsed:.2f}s ({count / elapsed:.0f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
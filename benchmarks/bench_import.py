@@ -0,0 +1,89 @@
+# benchmarks/bench_import.py
+
+"""
+Import-time budget for the modules CLI tools and workers start from.
+
+Each module is imported in a fresh interpreter (several times, keeping
+the median) and must stay under its budget without pulling in any of the
+heavy packages listed for it. Exits 1 on a miss, so it can gate CI; --out
+writes the bench_pipeline JSON shape for `bench_pipeline compare`.
+
+    python -m benchmarks.bench_import --out imports.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# module -> (budget in ms, packages it must not import)
+BUDGETS = {
+    "engine": (25.0, ["streamlit", "pandas", "numpy"]),
+    "matcher": (10.0, ["streamlit", "pandas", "numpy"]),
+}
+RUNS = 5
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(m for m in sys.modules if "." not in m)}}))
+"""
+
+
+def import_once(module):
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check(module, budget_ms, forbidden, runs=RUNS):
+    samples = [import_once(module) for _ in range(runs)]
+    median_ms = statistics.median(s["ms"] for s in samples)
+    pulled_in = sorted(set(forbidden) & set(samples[-1]["modules"]))
+    return {
+        "size": "import",
+        "target": module,
+        "stage": "import",
+        "runs": runs,
+        "median_ms": median_ms,
+        "min_ms": min(s["ms"] for s in samples),
+        "budget_ms": budget_ms,
+        "forbidden_imports": pulled_in,
+        "ok": (budget_ms is None or median_ms <= budget_ms) and not pulled_in,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS), help="modules to check")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for module in args.modules:
+        budget_ms, forbidden = BUDGETS.get(module, (None, []))
+        r = check(module, budget_ms, forbidden, args.runs)
+        results.append(r)
+        mark = "ok" if r["ok"] else "OVER BUDGET"
+        extra = f"  imports {', '.join(r['forbidden_imports'])}" if r["forbidden_imports"] else ""
+        budget = "no budget" if budget_ms is None else f"budget {budget_ms:g} ms"
+        print(f"{module:<12} {r['median_ms']:8.2f} ms ({budget})  {mark}{extra}")
+
+    if args.out:
+        report = {"meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S")}, "results": results}
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# benchmarks/bench_parser.py
+
+"""
+Throughput of the natural-language parser.
+
+Runs parse_one_shot and every pick_* function over a generated query
+corpus (see querygen.py) and reports queries/sec with p50/p99 latency per
+function. For engine (app_3's parser), "parse_one_shot" goes through
+its LRU cache and "parse_one_shot.uncached" does not. --out writes the
+same JSON shape as bench_pipeline, so `python -m benchmarks.bench_pipeline
+compare` works on it too.
+
+    python -m benchmarks.bench_parser --queries 50000 --out parser.json
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.querygen import generate_queries
+
+PICK_FUNCTIONS = [
+    "pick_cuisine", "pick_budget", "pick_budget_level", "pick_meal_type",
+    "pick_travel", "pick_halal_pref", "pick_location",
+]
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def time_calls(fn, queries):
+    latencies = []
+    started = time.perf_counter()
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "qps": len(queries) / elapsed if elapsed else float("inf"),
+        "median_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def run(n_queries, targets, seed=0):
+    queries = generate_queries(n_queries, seed)
+    results = []
+    for target in targets:
+        module = importlib.import_module(target)
+        module.parse_one_shot(queries[0])  # build lazy matchers/vocabularies first
+
+        functions = {}
+        if hasattr(module, "_parse_cached"):
+            module._parse_cached.cache_clear()
+            functions["parse_one_shot.uncached"] = module._parse_one_shot
+        functions["parse_one_shot"] = module.parse_one_shot
+        functions.update({name: getattr(module, name) for name in PICK_FUNCTIONS if hasattr(module, name)})
+
+        for stage, fn in functions.items():
+            stats = time_calls(fn, queries)
+            results.append({"size": n_queries, "target": target, "stage": stage, **stats})
+            print(
+                f"{target:>15} {stage:<24} {stats['qps']:12.0f} q/s"
+                f"  p50 {stats['median_ms']:8.4f} ms  p99 {stats['p99_ms']:8.4f} ms",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--targets", nargs="+", default=["engine"], choices=["engine", "baseline_model"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.queries, args.targets, args.seed)
+    if args.out:
+        report = {"meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S")}, "results": results}
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# benchmarks/bench_pipeline.py
+
+"""
+Latency benchmarks for the recommendation pipeline.
+
+Times load_catalog, parse_one_shot, filter_open_today and
+score_restaurants for baseline_model.py, app.py and engine.py (app_3) against
+synthetic catalogs (see synthetic.py), and writes the timings to JSON.
+`compare` flags stages that got slower between two result files.
+
+    python -m benchmarks.bench_pipeline run --sizes 50 10000 --out new.json
+    python -m benchmarks.bench_pipeline compare base.json new.json
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import catalog
+import ranking_cache
+from benchmarks.querygen import EXAMPLES as QUERIES
+from benchmarks.synthetic import write_catalog
+from snapshot import compile_snapshot, snapshot_dir_for
+
+SIZES = [50, 10_000, 100_000, 1_000_000]
+TARGETS = ["baseline_model", "app", "engine"]  # engine: app_3's parser and scorer
+
+# app.py asks one question at a time instead of parsing a sentence
+GUIDED_ANSWERS = {
+    "cuisine": "Malay",
+    "max_budget": "12",
+    "meal_type": "lunch",
+    "max_travel": "10",
+    "halal_pref": "only halal",
+    "location_pref": "tronoh",
+}
+
+MIN_RUNS = 3
+MAX_RUNS = 50
+TIME_BUDGET_S = 1.0  # per stage, once MIN_RUNS are done
+
+
+def measure(fn):
+    """Run fn repeatedly and return the wall time of each run in seconds."""
+    times = []
+    started = time.perf_counter()
+    while len(times) < MAX_RUNS:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if len(times) >= MIN_RUNS and time.perf_counter() - started > TIME_BUDGET_S:
+            break
+    return times
+
+
+def summarize(size, target, stage, times):
+    ms = sorted(t * 1000 for t in times)
+    return {
+        "size": size,
+        "target": target,
+        "stage": stage,
+        "runs": len(ms),
+        "median_ms": statistics.median(ms),
+        "p95_ms": ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))],
+        "min_ms": ms[0],
+    }
+
+
+def bench_loading(size, csv_path):
+    results = []
+
+    def cold():
+        catalog._catalog_cache.clear()
+        catalog.load_catalog(csv_path)
+
+    # a snapshot left in --data-dir by an earlier run would make the cold
+    # stage time the mmap load instead of parsing the CSV
+    snapshot_dir = snapshot_dir_for(csv_path)
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    results.append(summarize(size, "catalog", "load_catalog.cold", measure(cold)))
+    results.append(summarize(size, "catalog", "load_catalog.warm", measure(lambda: catalog.load_catalog(csv_path))))
+
+    compile_snapshot(csv_path, catalog.read_catalog, catalog.SCHEMA_VERSION)
+    results.append(summarize(size, "catalog", "load_catalog.snapshot", measure(cold)))
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    return results
+
+
+def bench_target(size, target, df):
+    module = importlib.import_module(target)
+    results = []
+
+    if hasattr(module, "parse_one_shot"):
+        def parse():
+            for q in QUERIES:
+                module.parse_one_shot(q)
+        prefs = module.parse_one_shot(QUERIES[0])
+        results.append(summarize(size, target, "parse_one_shot", measure(parse)))
+    else:
+        def parse():
+            module.parse_preferences(GUIDED_ANSWERS)
+        prefs = module.parse_preferences(GUIDED_ANSWERS)
+        results.append(summarize(size, target, "parse_preferences", measure(parse)))
+
+    results.append(summarize(size, target, "filter_open_today", measure(lambda: module.filter_open_today(df))))
+    with ranking_cache.bypass():
+        results.append(summarize(
+            size, target, "score_restaurants",
+            measure(lambda: module.score_restaurants(df, prefs, True)),
+        ))
+    if hasattr(module, "rank_restaurants"):  # engine: top-k through the ranking cache
+        results.append(summarize(
+            size, target, "score_restaurants.cached",
+            measure(lambda: module.score_restaurants(df, prefs, True, top_k=module.MAX_RESULTS)),
+        ))
+    return results
+
+
+def run(sizes, targets, out_path, data_dir=None):
+    data_dir = Path(data_dir or tempfile.mkdtemp(prefix="makansini-bench-"))
+    results = []
+    for size in sizes:
+        csv_path = data_dir / f"synthetic_{size}.csv"
+        if not csv_path.exists():
+            write_catalog(csv_path, size)
+        print(f"[{size} rows] {csv_path}", file=sys.stderr)
+
+        first = len(results)
+        results.extend(bench_loading(size, csv_path))
+        df = catalog.load_restaurants(csv_path)
+        for target in targets:
+            results.extend(bench_target(size, target, df))
+        for r in results[first:]:
+            print(f"  {r['target']:>15} {r['stage']:<24} {r['median_ms']:10.3f} ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    Path(out_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+def compare(base_path, new_path, threshold=0.10, floor_ms=0.05):
+    """
+    Print every stage present in both files; flag the ones whose median grew
+    by more than `threshold` (and by more than floor_ms, to ignore noise).
+    Returns the list of regressions.
+    """
+    def index(path):
+        report = json.loads(Path(path).read_text(encoding="utf-8"))
+        return {(r["size"], r["target"], r["stage"]): r for r in report["results"]}
+
+    base, new = index(base_path), index(new_path)
+    regressions = []
+    for key in sorted(base.keys() & new.keys()):
+        old_ms, new_ms = base[key]["median_ms"], new[key]["median_ms"]
+        ratio = new_ms / old_ms if old_ms else float("inf")
+        regressed = ratio > 1 + threshold and new_ms - old_ms > floor_ms
+        if regressed:
+            regressions.append({"key": key, "base_ms": old_ms, "new_ms": new_ms, "ratio": ratio})
+        size, target, stage = key
+        mark = "REGRESSION" if regressed else ""
+        print(f"{size:>9} {target:>15} {stage:<24} {old_ms:10.3f} -> {new_ms:10.3f} ms  x{ratio:5.2f} {mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="time every stage and write a JSON report")
+    run_p.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    run_p.add_argument("--targets", nargs="+", default=TARGETS, choices=TARGETS)
+    run_p.add_argument("--out", default="bench_results.json")
+    run_p.add_argument("--data-dir", help="where synthetic CSVs are written and reused")
+
+    cmp_p = sub.add_parser("compare", help="flag regressions between two reports")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args.sizes, args.targets, args.out, args.data_dir)
+        return 0
+    regressions = compare(args.base, args.new, args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
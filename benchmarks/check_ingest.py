@@ -0,0 +1,93 @@
+# benchmarks/check_ingest.py
+
+"""
+Regression check for append-only ingestion (catalog.reload_catalog).
+
+Copies a survey CSV to a temp directory, appends rows the ways a form
+re-export does (with and without a trailing newline, and a row still
+being written), and after each reload compares the live catalog with a
+full catalog.read_catalog() of the same file. Exits 1 on a mismatch.
+
+    python -m benchmarks.check_ingest
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import catalog
+
+
+def _same(live, full):
+    if len(live) != len(full) or list(live.columns) != list(full.columns):
+        return False
+    for col in full.columns:
+        if col in catalog.TAG_COLUMNS.values():
+            continue  # bit positions may differ; compared through tag_match below
+        a, b = live[col].astype(object), full[col].astype(object)
+        if not ((a == b) | (a.isna() & b.isna())).all():
+            return False
+    for col, vocab in full.attrs["tag_bits"].items():
+        for tag in vocab:
+            if not np.array_equal(catalog.tag_match(live, col, [tag]), catalog.tag_match(full, col, [tag])):
+                return False
+    return True
+
+
+def _row(raw, i):
+    """Row i of raw as one CSV line, without a line ending."""
+    return raw.iloc[[i]].to_csv(header=False, index=False).rstrip("\r\n")
+
+
+def run(csv_file):
+    work = Path(tempfile.mkdtemp(prefix="makansini-ingest-"))
+    path = work / Path(csv_file).name
+    shutil.copy(catalog.resolve_path(csv_file), path)
+    raw = pd.read_csv(path)
+
+    def append(text):
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            f.write(text)
+
+    def ends_with_newline():
+        return path.read_bytes().endswith(b"\n")
+
+    steps = [
+        # (name, bytes to append, settled, expected reload mode)
+        ("no trailing newline", lambda: ("" if ends_with_newline() else "\n") + _row(raw, 0), True, "append"),
+        ("next row, no trailing newline", lambda: "\n" + _row(raw, 1), True, "append"),
+        ("trailing newline", lambda: "\n" + _row(raw, 2) + "\n", True, "append"),
+        ("row still being written", lambda: _row(raw, 3)[:5], False, "full"),
+        ("rest of that row", lambda: _row(raw, 3)[5:] + "\n", True, "full"),
+        ("after the full re-read", lambda: _row(raw, 4), True, "append"),
+    ]
+
+    failures = 0
+    try:
+        catalog.reload_catalog(path, settled=True)
+        for name, text, settled, mode in steps:
+            append(text())
+            live = catalog.reload_catalog(path, settled=settled)[1]
+            stats = catalog.reload_stats(path)
+            ok = stats["mode"] == mode and (not settled or _same(live, catalog.read_catalog(path)))
+            failures += not ok
+            print(f"{name:<32} mode={stats['mode']:<6} rows={len(live):<5} {'ok' if ok else 'FAILED'}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="?", default=catalog.CSV_FILE, help="survey CSV to copy")
+    args = parser.parse_args(argv)
+    return 1 if run(args.csv) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# benchmarks/querygen.py
+
+"""
+Realistic Manglish query corpus for the one-shot parser.
+
+Queries are stitched together from the parser's synonym dictionaries, the
+"How to talk to this bot" examples, random numbers with budget/travel
+units and filler words, in random order, casing and punctuation. A share
+of the corpus repeats the examples verbatim, like real traffic does.
+
+    python -m benchmarks.querygen 50000 > queries.txt
+"""
+
+import random
+import sys
+
+from engine import (
+    BUDGET_SYNONYMS, CUISINE_SYNONYMS, LOCATION_SYNONYMS, MEALTYPE_SYNONYMS,
+)
+
+# the examples from app_3's "How to talk to this bot" expander
+EXAMPLES = [
+    "cheap halal mamak inside utp",
+    "korean dinner under rm20 within 5 mins from utp",
+    "any halal western food in tronoh, budget 15",
+    "murah malay breakfast near BU",
+    "thai food, halal, max rm12, 10 minutes from utp",
+]
+
+FILLERS = [
+    "nak", "makan", "lah", "jom", "kat", "area", "pls", "bro", "sis", "best",
+    "sedap", "yang", "near", "around", "food", "place", "any", "tak", "boleh",
+    "something", "craving", "want", "i", "for", "me", "eh", "je", "cari",
+]
+BUDGET_FORMS = ["rm{n}", "rm {n}", "under {n}", "below rm{n}", "budget {n}", "max rm{n}",
+                "bawah {n}", "{n} ringgit", "around rm{n}", "taknak lebih {n}"]
+TRAVEL_FORMS = ["{n} mins", "{n} min", "{n} minutes", "within {n} mins", "{n} minute from utp"]
+HALAL_FORMS = ["halal", "halal only", "tak kisah halal", "doesn't matter", "must halal"]
+PUNCTUATION = ["", "", "", ",", "!", "?", " pls", "..."]
+
+# share of queries that are one of the expander examples, verbatim
+EXAMPLE_SHARE = 0.1
+
+
+def _phrases(synonyms):
+    return [s for syns in synonyms.values() for s in syns] + [k.lower() for k in synonyms]
+
+
+def generate_queries(n, seed=0):
+    rng = random.Random(seed)
+    slots = {
+        "cuisine": _phrases(CUISINE_SYNONYMS),
+        "budget_word": _phrases(BUDGET_SYNONYMS),
+        "meal": _phrases(MEALTYPE_SYNONYMS),
+        "location": _phrases(LOCATION_SYNONYMS),
+    }
+
+    queries = []
+    for _ in range(n):
+        if rng.random() < EXAMPLE_SHARE:
+            queries.append(rng.choice(EXAMPLES))
+            continue
+
+        parts = []
+        for slot, phrases in slots.items():
+            if rng.random() < 0.55:
+                parts.append(rng.choice(phrases))
+        if rng.random() < 0.4:
+            parts.append(rng.choice(BUDGET_FORMS).format(n=rng.randint(5, 40)))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(TRAVEL_FORMS).format(n=rng.choice([3, 5, 7, 10, 15, 20])))
+        if rng.random() < 0.35:
+            parts.append(rng.choice(HALAL_FORMS))
+        parts += rng.sample(FILLERS, rng.randint(0, 4))
+        if not parts:
+            parts.append(rng.choice(slots["cuisine"]))
+
+        rng.shuffle(parts)
+        text = " ".join(parts) + rng.choice(PUNCTUATION)
+        roll = rng.random()
+        if roll < 0.1:
+            text = text.upper()
+        elif roll < 0.3:
+            text = text.capitalize()
+        queries.append(text)
+    return queries
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for q in generate_queries(count):
+        print(q)
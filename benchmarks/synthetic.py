@@ -0,0 +1,60 @@
+# benchmarks/synthetic.py
+
+"""
+Synthetic restaurant catalogs in the "Clean Version" export layout.
+
+Every column is resampled from the real survey, so cuisine/dining tags,
+operating hours/days, locations, halal status and ratings follow the same
+distributions as the real data (including its blanks). The spend columns
+are drawn together so each row keeps a consistent range/min/max triple.
+
+    python -m benchmarks.synthetic 100000 out.csv
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from catalog import CLEAN_CSV, resolve_path
+
+SPEND_COLUMNS = [
+    "Range (min - max)",
+    "Minimum spending per person (RM)",
+    "Maximum spending per person (RM)",
+]
+
+
+def generate_catalog(rows, seed=0, source=None):
+    """A raw (un-normalized) Clean Version DataFrame with `rows` rows."""
+    real = pd.read_csv(source or resolve_path(CLEAN_CSV))
+    real = real.dropna(subset=["Restaurant Name"]).reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+
+    def resample(columns):
+        picks = rng.integers(0, len(real), size=rows)
+        return real[columns].iloc[picks].reset_index(drop=True)
+
+    out = pd.DataFrame(index=pd.RangeIndex(rows))
+    out["Date"] = resample(["Date"])["Date"]
+    names = resample(["Restaurant Name"])["Restaurant Name"]
+    out["Restaurant Name"] = names + " #" + pd.Series(np.arange(rows)).astype(str)
+    out[SPEND_COLUMNS] = resample(SPEND_COLUMNS)
+    for col in real.columns:
+        if col not in out.columns:
+            out[col] = resample([col])[col]
+    return out[list(real.columns)]
+
+
+def write_catalog(path, rows, seed=0):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generate_catalog(rows, seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1])
+    out = sys.argv[2] if len(sys.argv) > 2 else f"synthetic_{rows}.csv"
+    print(write_catalog(out, rows))
@@ -1,17 +1,797 @@
 # catalog.py
 
-import pandas as pd
+"""
+One place to load the restaurant survey.
+
+Both Google Form exports are supported: the raw "Form Responses 1" sheet
+and the hand-cleaned "Clean Version". The layout is detected from the
+header row and normalized to the same internal column names and compact
+dtypes, so every app scores the same frame.
+"""
+
+import io
+import re
+import threading
+import time
+import weakref
+from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+from snapshot import file_stamp, read_snapshot, snapshot_dir_for
+
+CLEAN_CSV = "Survey on Restaurant around Seri Iskandar (Responses) - Clean Version.csv"
+FORM_CSV = "Survey on Restaurant around Seri Iskandar (Responses) - Form Responses 1.csv"
+
 # Change this if you renamed the CSV
-CSV_FILE = "Survey on Restaurant around Seri Iskandar (Responses) - Form Responses 1.csv"
+CSV_FILE = CLEAN_CSV
+
+# header -> internal name, per export layout
+LAYOUTS = {
+    "clean": {
+        "Date": "submitted",
+        "Restaurant Name": "name",
+        "Range (min - max)": "spend_range",
+        "Minimum spending per person (RM)": "min_spend",
+        "Maximum spending per person (RM)": "max_spend",
+        "Dining tag": "dining_tag",
+        "Halal Status": "halal",
+        "Cuisine Tag": "cuisine",
+        "Operating Hours": "hours",
+        "Operating Days": "days",
+        "Travel Time from UTP": "travel_mins",
+        "Location/Area": "location",
+        "Rating": "rating",
+    },
+    "form": {
+        "Timestamp": "submitted",
+        "Restaurant Name": "name",
+        "Range spending per meal": "spend_range",
+        "Minimum spending per person  (eg: RM5)": "min_spend",
+        "Maximum spending per person (eg: RM15)": "max_spend",
+        "Dining Tag": "dining_tag",
+        "Is this restaurant Halal?": "halal",
+        "Cuisine Tag": "cuisine",
+        "Operating Hours (eg: 8.00am - 3.00pm)": "hours",
+        "Operating Days": "days",
+        "Travel time from UTP (in mins, eg: 6 mins)": "travel_mins",
+        "Location/Area": "location",
+        "Rating": "rating",
+    },
+}
+
+# Bump whenever normalize() changes its output, so stale snapshots are ignored
+SCHEMA_VERSION = 4
+
+NUMERIC_COLUMNS = ["min_spend", "max_spend", "travel_mins", "rating"]
+CATEGORY_COLUMNS = ["halal", "location"]
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_TAG_SPLIT = re.compile(r"[,/;]")
+
+# comma-separated list column -> uint64 multi-hot column built at load time
+TAG_COLUMNS = {
+    "cuisine": "cuisine_bits",
+    "dining_tag": "dining_bits",
+    "days": "days_bits",
+}
+# one bit per tag; past this, the rarest tags share the last bit
+MAX_TAG_BITS = 64
+OVERFLOW_BIT = MAX_TAG_BITS - 1
+
+# bits of the per-row `flag_bits` column
+FLAG_HALAL = 1
+FLAG_INSIDE_UTP = 2
+FLAG_DESSERT_ONLY = 4
+
+MINUTES_PER_DAY = 24 * 60
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# "07:00am", "5 pm", "5.00pm", "11AM", "23:30"
+_CLOCK = re.compile(r"(\d{1,2})(?:\s*[:.]\s*(\d{2}))?\s*([ap])?\.?\s*m?\b", re.IGNORECASE)
+_ALL_DAY = re.compile(r"24\s*(?:h|/\s*7)", re.IGNORECASE)  # "24 hours", "24hrs", "24/7"
+
+# a cuisine string with "dessert" but none of these is a dessert-only place
+DESSERT_MAIN_MEALS = "malay|nasi campur|western|mamak|indian|arabic|thai|fast food"
+
+
+def detect_layout(columns):
+    """Return the LAYOUTS key whose headers best match `columns`."""
+    columns = set(columns)
+    best, best_hits = None, 0
+    for layout, rename_map in LAYOUTS.items():
+        hits = len(columns & rename_map.keys())
+        if hits > best_hits:
+            best, best_hits = layout, hits
+    if best is None or "Restaurant Name" not in columns:
+        raise ValueError(f"Unrecognised survey export, columns: {sorted(columns)}")
+    return best
+
+
+def parse_spend_range(text):
+    """
+    "RM 11- RM15" -> (11.0, 15.0), "More than RM20" -> (20.0, nan).
+    Anything without a number gives (nan, nan).
+    """
+    if not isinstance(text, str):
+        return np.nan, np.nan
+    numbers = [float(n) for n in _NUMBER.findall(text)]
+    if not numbers:
+        return np.nan, np.nan
+    if len(numbers) == 1:
+        low = text.lower()
+        if any(w in low for w in ("below", "under", "less")):
+            return np.nan, numbers[0]
+        return numbers[0], np.nan
+    return min(numbers), max(numbers)
 
 
-def load_catalog():
+def normalize(df, layout=None):
     """
-    Load the CSV and return a raw DataFrame.
-    For now, no renaming or scoring – just to confirm it works.
+    Rename a raw survey export to internal names and shrink its dtypes:
+    float32 for the numeric columns, categoricals for halal/location, and
+    spend_lo / spend_hi parsed out of spend_range.
     """
-    csv_path = Path(__file__).parent / CSV_FILE
-    df = pd.read_csv(csv_path)
+    layout = layout or detect_layout(df.columns)
+    rename_map = LAYOUTS[layout]
+
+    df = df[[c for c in df.columns if c in rename_map]].rename(columns=rename_map)
+    df = df.dropna(subset=["name"]).reset_index(drop=True)
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float32)
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    if "spend_range" in df.columns:
+        # few distinct ranges, so parse each one once
+        bounds = {v: parse_spend_range(v) for v in df["spend_range"].dropna().unique()}
+        df["spend_lo"] = df["spend_range"].map({v: b[0] for v, b in bounds.items()}).astype(np.float32)
+        df["spend_hi"] = df["spend_range"].map({v: b[1] for v, b in bounds.items()}).astype(np.float32)
+
+    add_tag_bits(df)
+    add_hours(df)
     return df
+
+
+def append_rows(df, raw, layout=None):
+    """
+    normalize() only the raw rows and append them to the normalized df.
+    df's tag bits keep their meaning (new tags get the next free bits) and
+    categoricals gain any new categories. Returns a new frame; df is untouched.
+    """
+    new = normalize(raw, layout)
+    tag_bits = dict(df.attrs.get("tag_bits", {}))
+    for col, bits_col in TAG_COLUMNS.items():
+        if col in new.columns:
+            new[bits_col], tag_bits[col] = _encode_tags(new[col], tag_bits.get(col, []))
+
+    columns = {}
+    for col in df.columns:
+        old = df[col]
+        added = new[col] if col in new.columns else pd.Series(np.nan, index=new.index)
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            extra = [v for v in added.dropna().astype(str).unique() if v not in old.cat.categories]
+            old = old.cat.add_categories(extra)
+            added = pd.Categorical(added.astype(object), categories=old.cat.categories)
+        elif added.dtype != old.dtype:
+            added = added.astype(old.dtype)
+        columns[col] = pd.concat([old, pd.Series(added)], ignore_index=True)
+
+    merged = pd.DataFrame(columns, copy=False)
+    merged.attrs = {**df.attrs, "tag_bits": tag_bits}
+    return merged
+
+
+# ==========================
+# Tag bitmasks
+# ==========================
+
+def split_tags(value):
+    """ "Malay, Chinese / Thai" -> ["Malay", "Chinese", "Thai"] """
+    if not isinstance(value, str):
+        return []
+    return [t.strip() for t in _TAG_SPLIT.split(value) if t.strip()]
+
+
+def _encode_tags(series, vocab=None):
+    """
+    Multi-hot encode a comma-separated column.
+    Returns (uint64 array, tag list) where tag i owns bit i. Each distinct
+    string is split only once, however many rows share it.
+    vocab: an existing tag list to encode against (rows appended to a
+    catalog); tags it lacks are added after it.
+    """
+    codes, uniques = pd.factorize(series)
+    parsed = [split_tags(u) for u in uniques]
+
+    if vocab is None:
+        counts = {}
+        for tags, n in zip(parsed, np.bincount(codes[codes >= 0], minlength=len(uniques))):
+            for tag in tags:
+                counts[tag] = counts.get(tag, 0) + int(n)
+        # most frequent tags get their own bit
+        vocab = sorted(counts, key=lambda t: (-counts[t], t))
+    else:
+        vocab = list(vocab) + sorted({t for tags in parsed for t in tags} - set(vocab))
+    bit_of = {tag: min(i, OVERFLOW_BIT) for i, tag in enumerate(vocab)}
+
+    unique_bits = np.zeros(len(uniques) + 1, dtype=np.uint64)  # last slot: missing value
+    for i, tags in enumerate(parsed):
+        for tag in tags:
+            unique_bits[i] |= np.uint64(1) << np.uint64(bit_of[tag])
+    return unique_bits[codes], vocab
+
+
+def _unique_flags(series, predicate, flag):
+    """Evaluate predicate(str) once per distinct value and spread the result."""
+    codes, uniques = pd.factorize(series)
+    per_unique = np.array([flag if predicate(str(u)) else 0 for u in uniques] + [0], dtype=np.uint8)
+    return per_unique[codes]
+
+
+def add_tag_bits(df):
+    """
+    Add the *_bits multi-hot columns and the `flag_bits` column in place.
+    The tag list behind each bits column is kept in df.attrs["tag_bits"].
+    """
+    tag_bits = {}
+    for col, bits_col in TAG_COLUMNS.items():
+        if col in df.columns:
+            df[bits_col], tag_bits[col] = _encode_tags(df[col])
+    df.attrs["tag_bits"] = tag_bits
+
+    flags = np.zeros(len(df), dtype=np.uint8)
+    if "halal" in df.columns:
+        flags |= _unique_flags(df["halal"], lambda v: "yes" in v.lower(), FLAG_HALAL)
+    if "location" in df.columns:
+        flags |= _unique_flags(df["location"], lambda v: "inside utp" in v.lower(), FLAG_INSIDE_UTP)
+    if "cuisine" in df.columns:
+        main_meals = re.compile(DESSERT_MAIN_MEALS)
+        flags |= _unique_flags(
+            df["cuisine"],
+            lambda v: "dessert" in v.lower() and not main_meals.search(v.lower()),
+            FLAG_DESSERT_ONLY,
+        )
+    df["flag_bits"] = flags
+    return df
+
+
+def tag_mask(df, column, terms):
+    """
+    Bits of every tag in `column` that contains one of `terms`
+    (case-insensitive substring, like str.contains on a single tag).
+    Returns (mask, hits_overflow).
+    """
+    return vocab_mask(df.attrs.get("tag_bits", {}).get(column, []), terms)
+
+
+def vocab_mask(vocab, terms):
+    """tag_mask() for a bare tag list (tag i owns bit i)."""
+    terms = [t.lower() for t in terms if t]
+    mask = 0
+    for i, tag in enumerate(vocab):
+        tag_low = tag.lower()
+        if any(t in tag_low for t in terms):
+            mask |= 1 << min(i, OVERFLOW_BIT)
+    return mask, bool(mask >> OVERFLOW_BIT)
+
+
+def tag_match(df, column, terms):
+    """
+    Boolean Series: rows whose `column` list has a tag containing any of
+    `terms`. Uses the precomputed bits; only rows on the shared overflow
+    bit fall back to a string scan.
+    """
+    mask, hits_overflow = tag_mask(df, column, terms)
+    bits = df[TAG_COLUMNS[column]].to_numpy()
+    matched = (bits & np.uint64(mask)) != 0
+
+    if hits_overflow:
+        exact = mask & ~(1 << OVERFLOW_BIT)
+        matched = (bits & np.uint64(exact)) != 0
+        shared = (bits >> np.uint64(OVERFLOW_BIT)) & np.uint64(1) == 1
+        if shared.any():
+            pattern = "|".join(re.escape(t) for t in terms if t)
+            scanned = df.loc[shared, column].astype(str).str.contains(pattern, case=False, na=False)
+            matched[shared] |= scanned.to_numpy(dtype=bool)
+
+    return pd.Series(matched, index=df.index)
+
+
+# ==========================
+# Operating hours
+# ==========================
+
+def _clock_minutes(hour, minute, meridiem):
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    if hour > 24 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def parse_hours(text):
+    """
+    "07:00am - 10:00pm" -> (420, 1320) minutes since midnight.
+    A close <= open means the range runs past midnight ("05:00pm - 02:00am"
+    -> (1020, 120)). "24 hours" / "24/7" -> (0, 1440). Unparseable text
+    -> None.
+    """
+    if not isinstance(text, str):
+        return None
+    if _ALL_DAY.search(text):
+        return 0, MINUTES_PER_DAY
+
+    clocks = _CLOCK.findall(text)
+    if len(clocks) != 2:
+        return None
+    (h1, m1, ap1), (h2, m2, ap2) = clocks
+    closes = _clock_minutes(h2, m2, ap2 or ap1)
+    opens = _clock_minutes(h1, m1, ap1)
+    if not ap1 and ap2 and closes is not None:
+        # "5 - 10pm" is 17:00-22:00, but "10 - 2pm" stays 10:00-14:00:
+        # borrow the meridiem only when it keeps the start before the end
+        borrowed = _clock_minutes(h1, m1, ap2)
+        if borrowed is not None and borrowed < closes:
+            opens = borrowed
+    if opens is None or closes is None:
+        return None
+    return opens % MINUTES_PER_DAY, closes
+
+
+def add_hours(df):
+    """
+    Add open_min / close_min (int16 minutes since midnight, -1 if the
+    hours text could not be parsed) in place. Together with days_bits they
+    describe each row's minute-of-week opening intervals.
+    """
+    if "hours" not in df.columns:
+        return df
+    codes, uniques = pd.factorize(df["hours"])
+    parsed = [parse_hours(u) or (-1, -1) for u in uniques] + [(-1, -1)]
+    table = np.array(parsed, dtype=np.int16).reshape(-1, 2)
+    df["open_min"] = table[codes, 0]
+    df["close_min"] = table[codes, 1]
+    return df
+
+
+def open_at(df, when=None):
+    """
+    Boolean Series: rows open at `when` (a datetime, default now).
+    A row is open if today is an operating day and the minute falls in
+    [open, close), or yesterday was one and we are still inside a range
+    that ran past midnight. Rows whose hours could not be parsed fall back
+    to the operating-day check alone.
+    """
+    is_open = open_mask(
+        df["days_bits"].to_numpy(),
+        df.attrs.get("tag_bits", {}).get("days", []),
+        df["open_min"].to_numpy(),
+        df["close_min"].to_numpy(),
+        when,
+    )
+    return pd.Series(is_open, index=df.index)
+
+
+def open_mask(days_bits, days_vocab, opens, closes, when=None):
+    """open_at() on bare arrays; returns a bool ndarray."""
+    when = when or datetime.now()
+    day = when.weekday()
+    minute = when.hour * 60 + when.minute
+
+    today_bits, _ = vocab_mask(days_vocab, [DAY_NAMES[day]])
+    yesterday_bits, _ = vocab_mask(days_vocab, [DAY_NAMES[(day - 1) % 7]])
+    today = (days_bits & np.uint64(today_bits)) != 0
+    yesterday = (days_bits & np.uint64(yesterday_bits)) != 0
+
+    known = opens >= 0
+    overnight = known & (closes <= opens)
+    same_day = np.where(overnight, minute >= opens, (minute >= opens) & (minute < closes))
+    spill_over = overnight & (minute < closes)
+
+    return np.where(known, (today & same_day) | (yesterday & spill_over), today)
+
+
+def read_catalog(csv_path):
+    """Parse and normalize one CSV, bypassing the cache and snapshot."""
+    return normalize(pd.read_csv(csv_path))
+
+
+# One parsed catalog per process, shared by every session and helper.
+# Keyed on the CSV path; the (mtime, size) stamp decides when to re-read
+# and doubles as the catalog version. Structures derived from a catalog
+# (vocabularies, matchers, ...) are cached next to it and dropped with it.
+# Callers must treat the returned DataFrame as read-only.
+_catalog_lock = threading.RLock()
+_catalog_cache = {}  # csv_path -> (stamp, df, derived)
+_builders = {}  # csv_path -> {derived name: build}, rebuilt eagerly on hot reload
+_building = threading.local()  # entry a reload is still assembling, per thread
+
+
+def resolve_path(csv_file=CSV_FILE):
+    return Path(__file__).parent / csv_file
+
+
+def _read_entry(csv_path, stamp):
+    # prefer the memory-mapped snapshot (python snapshot.py) when it is fresh
+    df = read_snapshot(snapshot_dir_for(csv_path), stamp, SCHEMA_VERSION)
+    if df is None:
+        df = read_catalog(csv_path)
+    return (stamp, df, {})
+
+
+def _catalog_entry(csv_file):
+    csv_path = resolve_path(csv_file)
+    pending = getattr(_building, "entries", {}).get(csv_path)
+    if pending is not None:
+        return pending
+    if csv_path in _watchers:
+        # the watcher keeps this one fresh; never stat or block here
+        return _catalog_cache[csv_path]
+
+    stamp = file_stamp(csv_path)
+    cached = _catalog_cache.get(csv_path)
+    if cached is not None and cached[0] == stamp:
+        return cached
+
+    with _catalog_lock:
+        # another session may have re-read it while we waited
+        cached = _catalog_cache.get(csv_path)
+        if cached is not None and cached[0] == stamp:
+            return cached
+        cached = _read_entry(csv_path, stamp)
+        _catalog_cache[csv_path] = cached
+    return cached
+
+
+def load_catalog(csv_file=CSV_FILE):
+    """
+    Return the normalized catalog for csv_file (either export layout).
+    """
+    return _catalog_entry(csv_file)[1]
+
+
+def catalog_version(csv_file=CSV_FILE):
+    """Opaque, hashable version of the catalog load_catalog() returns."""
+    return _catalog_entry(csv_file)[0]
+
+
+def derived(name, build, csv_file=CSV_FILE):
+    """
+    Return build(df, version) for the current catalog, building it at most
+    once per catalog version.
+    """
+    return _derived(_catalog_entry(csv_file), name, build, resolve_path(csv_file))
+
+
+def _derived(entry, name, build, csv_path):
+    stamp, df, cache = entry
+    if name not in cache:
+        _builders.setdefault(csv_path, {}).setdefault(name, build)
+        with _catalog_lock:
+            if name not in cache:
+                cache[name] = build(df, stamp)
+    return cache[name]
+
+
+_frame_cache = {}  # id(df) -> (weakref to df, {name: value})
+
+
+def per_frame(df, name, build):
+    """
+    build(df) cached on the frame object for as long as it is alive (like
+    scoring.features_for). Unlike derived(), the result always belongs to
+    the frame the caller already holds, even if a reload has swapped the
+    catalog since.
+    """
+    key = id(df)
+    hit = _frame_cache.get(key)
+    if hit is None or hit[0]() is not df:
+        with _catalog_lock:
+            hit = _frame_cache.get(key)
+            if hit is None or hit[0]() is not df:
+                ref = weakref.ref(df, lambda _, key=key: _frame_cache.pop(key, None))
+                hit = _frame_cache[key] = (ref, {})
+    values = hit[1]
+    if name not in values:
+        with _catalog_lock:
+            if name not in values:
+                values[name] = build(df)
+    return values[name]
+
+
+# ==========================
+# Restaurants (responses grouped by name)
+# ==========================
+# The survey has one row per response, so a restaurant reviewed several
+# times appears several times. load_restaurants() folds those rows into
+# one per restaurant; that is the frame the apps score.
+_KEY_JUNK = re.compile(r"[^0-9a-z]+")
+
+
+def restaurant_key(name):
+    """ "Cafe V1", " cafe-v1 " -> "cafe v1" """
+    return _KEY_JUNK.sub(" ", str(name).lower()).strip()
+
+
+def aggregate_responses(df, version=None):
+    """
+    One row per restaurant_key(name), in order of first response. Adds
+    `responses` (count) and `rating_median`; `rating` becomes the mean,
+    min_spend / spend_lo the lowest and max_spend / spend_hi the highest
+    answer, and the tag columns the union of every response's tags.
+    Single-valued fields (hours, halal, location, ...) come from the
+    latest response. df is left untouched.
+    """
+    codes, uniques = pd.factorize(df["name"])
+    group, _ = pd.factorize(np.array([restaurant_key(u) for u in uniques], dtype=object))
+    group = group[codes]
+    counts = np.bincount(group)
+
+    if (counts == 1).all():
+        out = df.copy(deep=False)
+        out["responses"] = np.ones(len(df), dtype=np.int32)
+        if "rating" in df.columns:
+            out["rating_median"] = df["rating"].to_numpy()
+        return out
+
+    order = np.argsort(group, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    latest = order[starts + counts - 1]
+    out = df.iloc[latest].reset_index(drop=True)
+    out["responses"] = counts.astype(np.int32)
+
+    grouped = df.groupby(group, sort=True)
+    reductions = {
+        "rating": "mean", "min_spend": "min", "spend_lo": "min",
+        "max_spend": "max", "spend_hi": "max", "travel_mins": "median",
+    }
+    for col, how in reductions.items():
+        if col in df.columns:
+            out[col] = grouped[col].agg(how).to_numpy(dtype=np.float32)
+    if "rating" in df.columns:
+        out["rating_median"] = grouped["rating"].median().to_numpy(dtype=np.float32)
+
+    merged = np.flatnonzero(counts > 1)
+    for col, bits_col in TAG_COLUMNS.items():
+        if col not in df.columns:
+            continue
+        out[bits_col] = np.bitwise_or.reduceat(df[bits_col].to_numpy()[order], starts)
+        values = df[col].to_numpy(dtype=object)[order]
+        texts = out[col].to_numpy(dtype=object)
+        for g in merged:
+            tags = dict.fromkeys(t for v in values[starts[g]:starts[g] + counts[g]] for t in split_tags(v))
+            texts[g] = ", ".join(tags) if tags else None
+        out[col] = texts
+
+    # halal / inside-UTP follow the latest answer; dessert-only must hold for all
+    flags = df["flag_bits"].to_numpy()
+    dessert = np.bitwise_and.reduceat(flags[order], starts) & FLAG_DESSERT_ONLY
+    out["flag_bits"] = (out["flag_bits"].to_numpy() & ~np.uint8(FLAG_DESSERT_ONLY)) | dessert
+    return out
+
+
+def restaurants_for(df, version=None):
+    """aggregate_responses(df), built once per catalog frame."""
+    return per_frame(df, "restaurants", aggregate_responses)
+
+
+def load_restaurants(csv_file=CSV_FILE):
+    """load_catalog() with duplicate responses folded by aggregate_responses()."""
+    return derived("restaurants", restaurants_for, csv_file)
+
+
+def restaurants_snapshot(csv_file=CSV_FILE):
+    """
+    (version, load_restaurants() frame) taken from one catalog entry, so
+    the version always describes the frame even if a reload lands between.
+    """
+    entry = _catalog_entry(csv_file)
+    return entry[0], _derived(entry, "restaurants", restaurants_for, resolve_path(csv_file))
+
+
+# ==========================
+# Hot reload
+# ==========================
+# watch_catalog() starts a daemon thread per CSV that polls its stamp. A
+# changed file is re-read, every derived structure built so far is rebuilt
+# for it, and only then is the new entry swapped in with one assignment.
+# Requests never wait on a reload: they get whichever entry is current,
+# and keep using the one they already hold until they finish.
+WATCH_INTERVAL_S = 2.0
+
+_watchers = {}  # csv_path -> thread
+_reload_stats = {}  # csv_path -> dict, see reload_stats()
+
+
+# Google Form exports only ever grow at the end. For each watched CSV we
+# remember how many bytes are already in the live catalog (plus the bytes
+# just before that point, to notice a rewritten file); a reload then parses
+# only what was appended and merges it with append_rows().
+TAIL_CHECK_BYTES = 256
+
+_ingested = {}  # csv_path -> {"stamp", "offset", "check", "columns", "layout"}
+
+
+def _remember_ingested(csv_path, stamp, offset, columns=None):
+    with open(csv_path, "rb") as f:
+        f.seek(max(0, offset - TAIL_CHECK_BYTES))
+        check = f.read(offset - f.tell())
+    if columns is None:
+        columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    _ingested[csv_path] = {
+        "stamp": stamp, "offset": offset, "check": check, "columns": columns, "layout": detect_layout(columns),
+    }
+
+
+def _ingest_tail(csv_path, stamp, current, settled=False):
+    """
+    The current entry plus the rows appended since it was loaded, or None
+    when the file was rewritten rather than appended to. settled: the file
+    has stopped changing, so text after the last newline is a whole row.
+    """
+    state = _ingested.get(csv_path)
+    size = stamp[1]
+    # the offset only describes the entry it was recorded for
+    if state is None or current is None or current[0] != state["stamp"] or size < state["offset"]:
+        return None
+    with open(csv_path, "rb") as f:
+        f.seek(state["offset"] - len(state["check"]))
+        if f.read(len(state["check"])) != state["check"]:
+            return None
+        tail = f.read(size - state["offset"])
+
+    # exports often end without a newline; past the last one is either the
+    # final row or a row still being written, which only `settled` tells apart
+    end = tail.rfind(b"\n") + 1
+    if end < len(tail) and tail[end:].strip():
+        if not settled:
+            return None  # re-read it all rather than skip the row for good
+        end = len(tail)
+    if not tail[:end].strip():
+        df, built = current[1], current[2]
+    else:
+        raw = pd.read_csv(io.BytesIO(tail[:end]), header=None, names=state["columns"])
+        df, built = append_rows(current[1], raw, state["layout"]), {}
+    _remember_ingested(csv_path, stamp, state["offset"] + end, state["columns"])
+    return (stamp, df, built)
+
+
+def reload_catalog(csv_file=CSV_FILE, settled=False):
+    """
+    Bring csv_file's catalog and derived structures up to date now, then
+    swap them in. Appended rows are parsed on their own; anything else
+    re-reads the whole file. settled: the file has not changed for a while
+    (the watcher's debounce), so a last row without a newline is complete.
+    """
+    csv_path = resolve_path(csv_file)
+    started = time.perf_counter()
+    stamp = file_stamp(csv_path)
+    current = _catalog_cache.get(csv_path)
+    entry = _ingest_tail(csv_path, stamp, current, settled)
+    mode = "append"
+    if entry is None:
+        mode = "full"
+        entry = _read_entry(csv_path, stamp)
+        _remember_ingested(csv_path, stamp, stamp[1])
+        if not settled and not _ingested[csv_path]["check"].endswith(b"\n"):
+            # the last row may have been read half written; re-read it all next time
+            del _ingested[csv_path]
+
+    _building.entries = {csv_path: entry}
+    try:
+        for name, build in list(_builders.get(csv_path, {}).items()):
+            derived(name, build, csv_file)
+    finally:
+        _building.entries = {}
+
+    _catalog_cache[csv_path] = entry
+    stats = _reload_stats.setdefault(csv_path, {"reloads": 0, "errors": 0, "last_error": None})
+    stats.update(
+        version=list(stamp),
+        rows=len(entry[1]),
+        loaded_at=datetime.now().isoformat(timespec="seconds"),
+        reload_ms=(time.perf_counter() - started) * 1000,
+        reloads=stats["reloads"] + 1,
+        mode=mode,
+        rows_added=len(entry[1]) - len(current[1]) if current is not None and mode == "append" else None,
+    )
+    return entry
+
+
+def _watch(csv_file, interval):
+    csv_path = resolve_path(csv_file)
+    seen = _catalog_cache[csv_path][0]
+    failed = None
+    while True:
+        time.sleep(interval)
+        try:
+            stamp = file_stamp(csv_path)
+        except OSError:
+            continue  # mid-replace; look again next tick
+        current = _catalog_cache[csv_path][0]
+        # reload once the file has stopped changing for one interval
+        if stamp != seen:
+            seen = stamp
+        elif stamp != current and stamp != failed:
+            try:
+                reload_catalog(csv_file, settled=True)
+            except Exception as e:  # keep serving the old catalog
+                failed = stamp
+                stats = _reload_stats.setdefault(csv_path, {"reloads": 0, "errors": 0, "last_error": None})
+                stats["errors"] += 1
+                stats["last_error"] = repr(e)
+
+
+def watch_catalog(csv_file=CSV_FILE, interval=WATCH_INTERVAL_S):
+    """Start hot reloading csv_file (once per process; later calls are no-ops)."""
+    csv_path = resolve_path(csv_file)
+    if csv_path in _watchers:
+        return
+    with _catalog_lock:
+        if csv_path in _watchers:
+            return
+        if csv_path not in _catalog_cache:
+            reload_catalog(csv_file)
+        thread = threading.Thread(
+            target=_watch, args=(csv_file, interval), name=f"catalog-watch:{csv_path.name}", daemon=True
+        )
+        thread.start()
+        _watchers[csv_path] = thread
+
+
+def reload_stats(csv_file=CSV_FILE):
+    """Current version, row count, last reload time/duration and error count."""
+    csv_path = resolve_path(csv_file)
+    stats = dict(_reload_stats.get(csv_path, {}))
+    entry = _catalog_cache.get(csv_path)
+    if entry is not None:
+        stats.setdefault("version", list(entry[0]))
+        stats.setdefault("rows", len(entry[1]))
+    stats["watching"] = csv_path in _watchers
+    return stats
+
+
+# ==========================
+# Vocabularies
+# ==========================
+
+class Vocabulary:
+    """
+    Known cuisine tags and locations of one catalog version, as sorted
+    lists and hashed lookups. (Phrase matching over messages lives in
+    engine's entity automaton.)
+    """
+
+    def __init__(self, df, version=None):
+        self.version = version
+        self.cuisines = sorted(df.attrs.get("tag_bits", {}).get("cuisine", []))
+        self.locations = sorted({
+            str(loc).strip()
+            for loc in df["location"].dropna().unique()
+            if str(loc).strip()
+        })
+
+        # every substring of every tag, so "is this text part of a known
+        # cuisine" is one hash lookup
+        self.cuisine_fragments = {
+            c.lower()[i:j]
+            for c in self.cuisines
+            for i in range(len(c))
+            for j in range(i + 1, len(c) + 1)
+        }
+
+    def has_cuisine(self, text):
+        text = (text or "").strip().lower()
+        return bool(text) and text in self.cuisine_fragments
+
+
+def get_vocabulary(csv_file=CSV_FILE):
+    return derived("vocabulary", Vocabulary, csv_file)
@@ -0,0 +1,517 @@
+# engine.py
+
+"""
+The one-shot recommender without any UI: app_3's sentence parser and the
+scoring entry points. Nothing here imports streamlit, and pandas/numpy
+(through catalog, scoring and ranking_cache) are only imported on first
+use, so `import engine` stays cheap for CLI tools, servers and worker
+processes. app_3.py is the Streamlit front end over this module.
+"""
+
+import math
+import re
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+from matcher import PhraseMatcher
+from timings import timed
+
+# catalog, scoring and ranking_cache load pandas/numpy, so they are imported
+# inside the functions that need them rather than up here
+
+MAX_RESULTS = 3  # suggestions per answer
+
+# ==========================
+# Data loading & scoring
+# ==========================
+
+# Drop Restaurants not open today from df
+@timed("filter_open_today")
+def filter_open_today(df):
+    from catalog import tag_match
+    today_name = datetime.today().strftime("%A")
+    return df[tag_match(df, "days", [today_name])]
+
+
+# Drop Restaurants closed at `when` (default now) using the parsed operating hours
+@timed("filter_open_now")
+def filter_open_now(df, when=None):
+    from catalog import open_at
+    return df[open_at(df, when)]
+
+
+# Vectorised Scoring Method - Score every row simultaneously without loop.
+# The NumPy kernel (scoring.py) works on arrays built once per catalog and
+# returns row positions + scores; only score_restaurants builds a DataFrame.
+# Top-k rankings are shared process-wide through ranking_cache.
+@timed("rank_restaurants")
+def rank_restaurants(df, preferences, only_open_today=True, open_at_time=None, top_k=None):
+    """(positions into df, total scores, component scores), best first."""
+    import ranking_cache
+    from scoring import features_for
+    return ranking_cache.rank(features_for(df), preferences, only_open_today, open_at_time, k=top_k)
+
+
+@timed("score_restaurants")
+def score_restaurants(df, preferences, only_open_today=True, debug_mode=False, open_at_time=None, top_k=None):
+    from scoring import ranked_frame
+
+    if df.empty:
+        return df
+
+    # top_k: only rank the best k rows (ties -> higher rating, then name A-Z)
+    positions, totals, comps = rank_restaurants(df, preferences, only_open_today, open_at_time, top_k)
+
+    # top of list score highest, with score + score_<aspect> columns (debug purposes)
+    return ranked_frame(df, positions, totals, comps)
+
+
+# Score many preference dicts (parse_one_shot output) in one matrix pass -
+# for offline evaluation, precomputation and load replay
+def score_restaurants_batch(df, preferences_list, top_k=3, only_open_today=True, open_at_time=None, as_frames=False):
+    """Per query: (positions, totals, components), or ranked DataFrames if as_frames."""
+    import scoring
+    from scoring import features_for, ranked_frame
+    results = scoring.rank_batch(
+        features_for(df), list(preferences_list), top_k, only_open_today, open_at_time
+    )
+    if as_frames:
+        return [ranked_frame(df, *result) for result in results]
+    return results
+
+
+# Plain-dict top k for JSON clients (server.py, batch.py)
+RESULT_COLUMNS = [
+    "name", "cuisine", "location", "min_spend", "max_spend", "rating",
+    "travel_mins", "halal", "hours", "days", "responses",
+]
+
+
+def _plain(value):
+    """NaN -> None, so the value serializes as JSON null."""
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _result_columns(df, version=None):
+    """
+    RESULT_COLUMNS as bare arrays, so gathering k rows skips pandas
+    indexing (which deep-copies df.attrs, tag vocabularies included, on
+    every call). Categoricals are kept as (codes, category values).
+    """
+    import pandas as pd
+    columns = {}
+    for col in RESULT_COLUMNS:
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[col] = (series.cat.codes.to_numpy(), series.cat.categories.tolist() + [None])
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            columns[col] = (None, series.to_numpy())
+        else:
+            columns[col] = (None, series.to_numpy(dtype=object))
+    return columns
+
+
+def _restaurant_columns(df, version=None):
+    from catalog import per_frame, restaurants_for
+    return per_frame(restaurants_for(df), "result_columns", _result_columns)
+
+
+@timed("top_k_records")
+def top_k_records(prefs, k=MAX_RESULTS, only_open_today=True, open_at_time=None):
+    from catalog import load_restaurants, per_frame
+    from scoring import COMPONENTS
+    # one frame for the whole request: ranking and the columns it indexes
+    # must come from the same catalog version, even across a hot reload
+    df = load_restaurants()
+    positions, totals, comps = rank_restaurants(df, prefs, only_open_today, open_at_time, k)
+
+    gathered = {}
+    for col, (codes, values) in per_frame(df, "result_columns", _result_columns).items():
+        if codes is None:
+            gathered[col] = values[positions].tolist()
+        else:
+            gathered[col] = [values[c] for c in codes[positions]]  # code -1 (NaN) -> None
+
+    results = []
+    for i in range(len(positions)):
+        item = {col: _plain(values[i]) for col, values in gathered.items()}
+        item["score"] = float(totals[i])
+        item["components"] = {name: float(comps[i, j]) for j, name in enumerate(COMPONENTS)}
+        results.append(item)
+    return results
+
+
+def _scoring_features(df, version=None):
+    from catalog import restaurants_for
+    from scoring import features_for
+    return features_for(restaurants_for(df))
+
+
+def warm_up():
+    """
+    Build everything a query needs for the current catalog. Going through
+    catalog.derived also enrolls each structure for rebuild on hot reload.
+    """
+    from catalog import derived
+    derived("scoring_features", _scoring_features)
+    derived("result_columns", _restaurant_columns)
+    find_entities("")
+
+
+# ==========================
+# Parsing helpers
+# ==========================
+
+# ====== location helpers and dictionary ==================
+def get_known_locations():
+    from catalog import get_vocabulary
+    return get_vocabulary().locations
+
+
+LOCATION_SYNONYMS = {
+    "Inside UTP": [
+        "inside utp", "dalam utp", "in utp", "within utp",
+        "dalam kampus", "inside campus", "inside"
+    ],
+    "Tronoh": [
+        "tronoh", "trono", "teronoh"
+    ],
+    "Bandar Universiti": [
+        "bandar universiti", "bandar uni", "bdr uni", "bu", "lotus"
+    ],
+    "Outside UTP": [
+        "town", "luar", "outside", "out"
+    ],
+    "SIBC": [
+        "sibc", "si", "seri iskandar", "billion"
+    ]
+}
+
+
+@timed("parse.pick_location")
+def pick_location(text, entities=None):
+    entities = find_entities(text) if entities is None else entities
+    mentioned = entity_values(entities, "location") | entity_values(entities, "known_location")
+
+    if "Outside UTP" in mentioned:
+        return "Outside UTP"
+
+    # first known location (alphabetically) mentioned in the text
+    for loc in get_known_locations():
+        if loc in mentioned:
+            return loc
+
+    return "Any"
+# =====================================================
+
+# ======== Budget Helpers and Dictionaries ============
+
+
+BUDGET_SYNONYMS = {
+    "cheap": [
+        "cheap", "murah", "bajet", "budget sikit",
+        "taknak mahal", "tak nak mahal", "not expensive",
+        "jimat", "low budget", "affordable", "ekonomi", "rahmah"
+    ],
+    "medium": [
+        "medium", "average", "sederhana", "mid-range", "mid range",
+        "normal price", "biasa", "reasonable"
+    ],
+    "expensive": [
+        "expensive", "mahal", "high end", "mahal sikit",
+        "premium", "luxury", "boujee"
+    ]
+}
+
+BUDGET_VALUES = {
+    "cheap": 10.0,
+    "medium": 15.0,
+    "expensive": 25.0
+}
+
+
+@timed("parse.pick_budget_level")
+def pick_budget_level(text: str, entities=None):
+    t = text.lower()
+    entities = find_entities(text) if entities is None else entities
+    levels = entity_values(entities, "budget")
+    for level in BUDGET_SYNONYMS:
+        if level in levels:
+            return level
+
+    m_num = re.search(r"(?:rm\s*|budget\s*|under\s*|below\s*)?(\d+)", t)
+    if m_num:
+        amount = float(m_num.group(1))
+        if amount >= 30:
+            return "expensive"
+
+    return None
+
+
+@timed("parse.pick_budget")
+def pick_budget(text, entities=None):
+    t = text.lower()
+    entities = find_entities(text) if entities is None else entities
+    levels = entity_values(entities, "budget")
+    for category in BUDGET_SYNONYMS:
+        if category in levels:
+            return BUDGET_VALUES[category]
+
+    rm_match = re.search(r"rm\s*(\d+)", t)
+    if rm_match:
+        return float(rm_match.group(1))
+
+    nearby_match = re.search(
+        r"(under|below|bawah|max|budget)\s*(rm)?\s*(\d+(?:\.\d+)?)\b(?!\s*(min|mins|minute|minutes))", t)
+    if nearby_match:
+        return float(nearby_match.group(3))
+
+    more_malay = re.search(r"(bawah|taknak lebih|tak nak lebih|jangan lebih|around|sekitar)\s*(rm)?\s*(\d+)", t)
+    if more_malay:
+        return float(more_malay.group(3))
+
+    ringgit_match = re.search(r"\b(\d+(?:\.\d+)?)\b\s*(ringgit)\b", t)
+    if ringgit_match:
+        return float(ringgit_match.group(1))
+
+    return None
+# =======================================================
+
+# ================ Cuisine ==============================
+
+
+CUISINE_SYNONYMS = {
+
+    "Malay": [
+        "melayu", "masakan melayu", "nasi lemak",
+        "lauk melayu", "lauk kampung", "kampung style",
+        "masakan kampung", "ayam masak merah", "asam pedas",
+        "nasi goreng kampung", "ikan keli", "ikan bawal", "sambal",
+        "nasi", "nasi goreng"
+    ],
+
+    "Chinese": [
+        "cina", "chinese", "char kuey teow", "ckt",
+        "dim sum", "wantan", "wonton", "claypot", "fried rice chinese",
+        "kongfu", "kung fu", "mee", "kuey teow"
+    ],
+
+    "Mamak": [
+        "mamak", "nasi kandar", "roti canai", "roti telur",
+        "roti tampal", "maggi goreng", "mee goreng mamak",
+        "teh tarik", "nasi goreng", "mee", "mee goreng"
+        "maggi"
+    ],
+
+    "Indian": [
+        "indian", "india", "biryani", "briyani", "tandoori",
+        "naan", "butter chicken", "masala", "dhal"
+    ],
+
+    "Korean": [
+        "korean", "korea", "kimchi", "ramyeon", "ramyun",
+        "tteokbokki", "kimbap", "jajangmyeon", "buldak"
+    ],
+
+    "Japanese": [
+        "japanese", "japan", "jepun", "sushi", "ramen",
+        "donburi", "bento", "tempura", "udon"
+    ],
+
+    "Fast Food": [
+        "kfc", "mcd", "mcD", "burger king", "a&w", "texas",
+        "marrybrown", "pizza", "dominos", "subway",
+        "fast food", "burger"
+    ],
+
+    "Nasi Campur": [
+        "nasi campur", "lauk campur", "mixed rice", "economy rice",
+        "kedai campur", "nasi berlauk", "lauk", "nasi"
+    ],
+
+    "Thailand": [
+        "thai", "tomyam", "tom yam", "paprik",
+        "pad kra pao", "thai food", "kerabu maggi",
+        "somtam", "nasi goreng", "siam", "kuey teow",
+        "maggi"
+    ],
+
+    "Arabic": [
+        "arab", "arabic", "mandy", "mandi", "kabsah",
+        "kebab", "shawarma", "hummus"
+    ],
+
+    "Dessert": [
+        "dessert", "aiskrim", "ice cream", "cendol",
+        "bingsu", "kek", "cake", "brownies", "pancake"
+    ],
+
+    "Beverage": [
+        "drink", "beverage", "minum", "coffee", "kopi",
+        "tea", "teh", "milkshake", "smoothie", "frappe",
+        "boba", "bubble tea", "ngopi"
+    ],
+
+    "Western": [
+        "western", "chicken chop", "lamb chop", "steak",
+        "fries", "fish and chips", "pasta", "spaghetti",
+        "carbonara", "bolognese", "lasagna", "grilled chicken"
+    ],
+
+    "Indonesian": ["indo", "gepuk", "bakso", "penyet", "nasi padang"],
+
+}
+
+
+
+@timed("parse.pick_cuisine")
+def pick_cuisine(text, entities=None):  # update from raja punya to allow multiple cuisine choices
+    entities = find_entities(text) if entities is None else entities
+    from_synonyms = entity_values(entities, "cuisine")
+    c_intext = [category for category in CUISINE_SYNONYMS if category in from_synonyms]
+    c_intext.extend(sorted(entity_values(entities, "known_cuisine")))
+
+    seen = set()
+    unique = []  # handle dupes e.g. "mamak nasi campur mamak kat SI" return ["Mamak", "Nasi Campur"]
+    for c in c_intext:
+        if c not in seen:
+            seen.add(c)
+            unique.append(c)
+
+    return unique  # may be [] if nothing found
+# =====================================================
+
+# ========== Pick Meal Helpers and Dict ===============
+
+
+MEALTYPE_SYNONYMS = {
+    "Breakfast": ["pagi", "sarapan", "bfast", "breakfast", "breakie"],
+    "Lunch": ["tengahari", "lunch", "afternoon", "noon"],
+    "Tea Time": ["petang", "ptg", "tea", "tea time", "hi tea", "hi-tea", "snack"],
+    "Dinner": ["malam", "mlm", "dinner", "supper", "night"]
+}
+
+
+@timed("parse.pick_meal_type")
+def pick_meal_type(t, entities=None):
+    entities = find_entities(t) if entities is None else entities
+    meals = entity_values(entities, "meal")
+
+    for category in MEALTYPE_SYNONYMS:
+        if category in meals:
+            return category
+
+    return "Any"
+# =====================================================
+
+# ================= Halal Pref ========================
+
+
+@timed("parse.pick_halal_pref")
+def pick_halal_pref(t):
+    t = t.lower()
+    if "halal" in t: return "Halal only"
+    return "-"
+# ====================================================
+
+# ================= Travel Time Pref =================
+
+
+@timed("parse.pick_travel")
+def pick_travel(t):
+    t = t.lower()
+    m = re.search(r"(\d+)\s*(min|mins|minute)", t)
+    return float(m.group(1)) if m else None
+# ===================================================
+
+# ========== Entity matcher ==========================
+
+# every *_SYNONYMS dict, plus the catalog's own cuisine tags and locations,
+# go into one automaton so a message is scanned once for all of them
+ENTITY_SYNONYMS = {
+    "cuisine": CUISINE_SYNONYMS,
+    "budget": BUDGET_SYNONYMS,
+    "meal": MEALTYPE_SYNONYMS,
+    "location": LOCATION_SYNONYMS,
+}
+
+Entity = namedtuple("Entity", ["start", "end", "category", "value"])
+
+
+def build_entity_matcher(df, version=None):
+    from catalog import Vocabulary
+    vocab = Vocabulary(df, version)
+    phrases = [
+        (syn.lower(), (category, canonical))
+        for category, synonyms in ENTITY_SYNONYMS.items()
+        for canonical, syns in synonyms.items()
+        for syn in syns
+    ]
+    phrases += [(c.lower(), ("known_cuisine", c)) for c in vocab.cuisines]
+    phrases += [(loc.lower(), ("known_location", loc)) for loc in vocab.locations]
+    return PhraseMatcher(phrases, whole_words=True)
+
+
+@timed("parse.find_entities")
+def find_entities(text):
+    """Every synonym/known name in text as Entity(start, end, category, value)."""
+    from catalog import derived
+    matcher = derived("entity_matcher", build_entity_matcher)
+    return [
+        Entity(start, end, category, value)
+        for start, end, (category, value) in matcher.finditer(text.lower())
+    ]
+
+
+def entity_values(entities, category):
+    return {e.value for e in entities if e.category == category}
+# ===================================================
+
+# ========== Call all pick fx =======================
+
+
+def _parse_one_shot(t):
+    entities = find_entities(t)  # one scan shared by every pick fx
+    cuisines = pick_cuisine(t, entities)
+    return {
+        "cuisine": cuisines[0] if cuisines else None,
+        "cuisines": cuisines,
+        "max_budget": pick_budget(t, entities),
+        "budget_level": pick_budget_level(t, entities),
+        "meal_type": pick_meal_type(t, entities),
+        "max_travel": pick_travel(t),
+        "halal_pref": pick_halal_pref(t),
+        "location_pref": pick_location(t, entities),
+    }
+
+
+# users repeat the same few prompts all day; remember their parses.
+# Keyed on the normalized text and the catalog (vocabulary) version.
+PARSE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(normalized_text, vocab_version):
+    return _parse_one_shot(normalized_text)
+
+
+def normalize_query(t):
+    # every pick fx lowercases and only looks at \s, so this is lossless
+    return " ".join(t.lower().split())
+
+
+@timed("parse_one_shot")
+def parse_one_shot(t):
+    from catalog import catalog_version
+    prefs = _parse_cached(normalize_query(t), catalog_version())
+    # hand out a copy so callers can't edit the cached dict
+    return {**prefs, "cuisines": list(prefs["cuisines"])}
+
+
+def parse_cache_stats():
+    info = _parse_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+# ===================================================
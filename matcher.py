@@ -0,0 +1,85 @@
+# matcher.py
+
+"""
+Aho-Corasick phrase matcher.
+
+Built once from a fixed phrase list, then finds every occurrence of every
+phrase in a text with a single left-to-right scan, so lookup cost depends
+on the length of the text, not on how many phrases there are.
+"""
+
+from collections import deque
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class PhraseMatcher:
+    """
+    phrases: iterable of (phrase, value) pairs. Phrases are matched
+    case-sensitively, so lowercase both the phrases and the text.
+    The same phrase may map to several values.
+    whole_words: only report matches not glued to a letter/digit/underscore
+    on either side (like wrapping every phrase in regex \b ... \b).
+    """
+
+    def __init__(self, phrases, whole_words=False):
+        self.whole_words = whole_words
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for phrase, value in phrases:
+            if phrase:
+                self._add(phrase, value)
+        self._link()
+
+    def _add(self, phrase, value):
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] += ((len(phrase), value),)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # a match ending here also ends every suffix match
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def finditer(self, text):
+        """Yield (start, end, value) for every (possibly overlapping) match."""
+        goto, fail, out = self._goto, self._fail, self._out
+        whole_words = self.whole_words
+        last = len(text) - 1
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            if whole_words and i < last and _is_word_char(text[i + 1]):
+                continue
+            for length, value in out[state]:
+                start = i + 1 - length
+                if whole_words and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                yield start, i + 1, value
+
+    def values(self, text):
+        """Set of values whose phrase occurs anywhere in text."""
+        return {value for _, _, value in self.finditer(text)}
@@ -0,0 +1,131 @@
+# profiling.py
+
+"""
+Opt-in cProfile capture of whole turns.
+
+    with profiling.profile_turn("app_3"):
+        ...
+
+MAKANSINI_PROFILE=1 profiles every turn, MAKANSINI_PROFILE=0.05 a random
+5% of them; force=True (app_3's debug-panel toggle) profiles one turn
+regardless. Each captured turn writes two files to MAKANSINI_PROFILE_DIR
+(default: <tmp>/makansini-profiles):
+
+    <name>-<time>-<pid>-<n>.prof       pstats dump (python -m pstats, snakeviz)
+    <name>-<time>-<pid>-<n>.collapsed  "a;b;c <microseconds>" lines for
+                                       flamegraph.pl / speedscope
+
+cProfile only records caller -> callee edges, not whole stacks, so the
+collapsed file splits each function's time across its callers in
+proportion to the time each caller spent in it. Stdlib only.
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import count
+from pathlib import Path
+
+PROFILE_RATE = float(os.environ.get("MAKANSINI_PROFILE") or 0)
+PROFILE_DIR = Path(os.environ.get("MAKANSINI_PROFILE_DIR") or Path(tempfile.gettempdir()) / "makansini-profiles")
+MAX_DEPTH = 100
+MIN_US = 1  # collapsed stacks cheaper than this are dropped
+
+_busy = threading.Lock()  # one profiler at a time per process
+_seq = count(1)
+_recent = deque(maxlen=20)  # paths of the last .prof files written
+
+
+def sampled(rate=None):
+    rate = PROFILE_RATE if rate is None else rate
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+@contextmanager
+def profile_turn(name="turn", force=False, rate=None, out_dir=None):
+    """
+    Profile the block when forced or sampled; yields the .prof path it
+    will write, or None when this turn is not profiled.
+    """
+    if not (force or sampled(rate)) or not _busy.acquire(blocking=False):
+        yield None
+        return
+    try:
+        out_dir = Path(out_dir or PROFILE_DIR)
+        stem = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_seq)}"
+        path = out_dir / f"{stem}.prof"
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            out_dir.mkdir(parents=True, exist_ok=True)
+            stats = pstats.Stats(profiler)
+            stats.dump_stats(path)
+            write_collapsed(stats, out_dir / f"{stem}.collapsed")
+            _recent.append(path)
+    finally:
+        _busy.release()
+
+
+def recent():
+    """.prof files written by this process, newest last."""
+    return list(_recent)
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == "~":  # builtins
+        return name.replace(";", ",")
+    return f"{name} ({Path(filename).name}:{line})".replace(";", ",")
+
+
+def collapsed_stacks(stats):
+    """{"root;...;leaf": microseconds of self time} from a pstats.Stats."""
+    table = stats.stats  # func -> (cc, nc, tottime, cumtime, {caller: (cc, nc, tt, ct)})
+    callees = {}
+    for func, (_, _, _, _, callers) in table.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks = {}
+
+    def walk(func, share, path, on_path):
+        tottime = table[func][2]
+        path = path + [_label(func)]
+        self_us = tottime * share * 1e6
+        if self_us >= MIN_US:
+            key = ";".join(path)
+            stacks[key] = stacks.get(key, 0) + self_us
+        if len(path) >= MAX_DEPTH:
+            return
+        for callee, edge_cumtime in callees.get(func, ()):
+            callee_cumtime = table[callee][3]
+            if callee in on_path or not callee_cumtime:
+                continue  # recursion is folded into the first frame
+            child_share = share * edge_cumtime / callee_cumtime
+            if callee_cumtime * child_share * 1e6 < MIN_US:
+                continue
+            walk(callee, child_share, path, on_path | {callee})
+
+    for func, (_, _, _, _, callers) in table.items():
+        if not callers:
+            walk(func, 1.0, [], {func})
+        for caller, edge in callers.items():
+            # called from a frame that was already running when profiling began
+            if caller not in table and table[func][3]:
+                walk(func, edge[3] / table[func][3], [_label(caller)], {func})
+    return stacks
+
+
+def write_collapsed(stats, path):
+    stacks = collapsed_stacks(stats)
+    lines = [f"{stack} {round(us)}" for stack, us in sorted(stacks.items()) if round(us) > 0]
+    Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
@@ -0,0 +1,151 @@
+# ranking_cache.py
+
+"""
+Bounded LRU + TTL cache of rankings.
+
+Most users send the same handful of intents, so rank() results are
+remembered per (canonical prefs, open-time bucket, catalog version). The
+bucket is the weekday plus clock hour for open-at-time queries (weekday
+alone for "open today"). An entry holds the best CANDIDATES rows that can
+be open anywhere in its bucket; a lookup filters them to the exact time
+asked for, so a hit returns what scoring.rank() would have returned.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+import scoring
+from timings import stage
+
+MAX_ENTRIES = 2048
+TTL_S = 15 * 60
+CANDIDATES = 200  # ranked rows kept per entry; also the largest k served from cache
+
+
+class LRUTTLCache:
+    """Thread-safe LRU dict whose entries also expire ttl seconds after insertion."""
+
+    def __init__(self, maxsize=MAX_ENTRIES, ttl=TTL_S, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = True
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if not self.enabled or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+            }
+
+
+RANKINGS = LRUTTLCache()
+
+
+def cache_stats():
+    return RANKINGS.stats()
+
+
+@contextmanager
+def bypass(cache=RANKINGS):
+    """Rank without reading or filling the cache (e.g. to time the kernel)."""
+    cache.enabled = False
+    try:
+        yield
+    finally:
+        cache.enabled = True
+
+
+def _bucket(only_open_today, open_at_time):
+    if open_at_time is not None:
+        return ("hour", open_at_time.weekday(), open_at_time.hour)
+    if only_open_today:
+        return ("day", datetime.today().weekday())
+    return ("all",)
+
+
+def _candidate_rows(features, bucket, open_at_time):
+    """Rows that can be open somewhere in the bucket."""
+    if bucket[0] == "hour":
+        return features.open_in_hour(open_at_time)
+    if bucket[0] == "day":
+        return features.open_rows(True, None, scoring.DAY_NAMES[bucket[1]])
+    return features.open_rows(False)
+
+
+def rank(features, preferences, only_open_today=True, open_at_time=None, k=None, cache=RANKINGS):
+    """
+    scoring.rank() through the cache. Full rankings (k=None) and k above
+    CANDIDATES are not cached.
+    """
+    if k is None or k > CANDIDATES or not cache.enabled:
+        return scoring.rank(features, preferences, only_open_today, open_at_time, k=k)
+
+    bucket = _bucket(only_open_today, open_at_time)
+    key = (scoring.preference_key(preferences), bucket, features.version)
+    ranked = cache.get(key)
+    if ranked is None:
+        with stage("rank.open_filter"):
+            rows = np.flatnonzero(_candidate_rows(features, bucket, open_at_time))
+        with stage("rank.score"):
+            ranked = scoring.rank(features, preferences, k=CANDIDATES, rows=rows)
+        for arr in ranked:
+            arr.setflags(write=False)  # shared by every caller
+        cache.put(key, ranked)
+
+    positions, totals, comps = ranked
+    if open_at_time is None:
+        return positions[:k], totals[:k], comps[:k]
+
+    with stage("rank.open_filter"):
+        keep = np.flatnonzero(features.open_among(positions, open_at_time))[:k]
+    if len(keep) < k and len(positions) == CANDIDATES:
+        # too few of the bucket's best are open at this exact minute
+        return scoring.rank(features, preferences, only_open_today, open_at_time, k=k)
+    return positions[keep], totals[keep], comps[keep]
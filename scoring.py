@@ -0,0 +1,326 @@
+# scoring.py
+
+"""
+NumPy scoring kernel behind engine.score_restaurants (used by app_3).
+
+CatalogFeatures pulls everything scoring needs out of a normalized catalog
+frame once (a float32 feature matrix plus the precomputed bit columns).
+rank() then scores every row with plain array expressions and returns row
+positions, totals and per-component scores (optionally just the top k, by
+partial selection); a DataFrame is only built by ranked_frame() for callers
+that want one. rank_batch() scores many preference dicts as one queries x
+restaurants matrix per aspect.
+"""
+
+import itertools
+import re
+import weakref
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from catalog import (
+    FLAG_DESSERT_ONLY, FLAG_HALAL, FLAG_INSIDE_UTP, OVERFLOW_BIT,
+    TAG_COLUMNS, DAY_NAMES, open_mask, vocab_mask,
+)
+
+# one column per aspect in the component matrix, in this order
+COMPONENTS = ("cuisine", "budget", "travel", "meal", "halal", "location", "rating")
+FEATURES = ("min_spend", "max_spend", "travel_mins", "rating")
+
+_MIN_SPEND, _MAX_SPEND, _TRAVEL, _RATING = range(len(FEATURES))
+_CUISINE, _BUDGET, _TRAVEL_SCORE, _MEAL, _HALAL, _LOCATION, _RATING_SCORE = range(len(COMPONENTS))
+
+
+_versions = itertools.count(1)
+
+
+class CatalogFeatures:
+    """Arrays scoring reads from one catalog frame, built once per frame."""
+
+    def __init__(self, df):
+        # process-unique; a reloaded or different catalog gets a new number
+        self.version = next(_versions)
+        self.n = len(df)
+        # column-major so each feature is a contiguous float32 vector
+        self.matrix = np.empty((self.n, len(FEATURES)), dtype=np.float32, order="F")
+        for i, col in enumerate(FEATURES):
+            self.matrix[:, i] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        self.rating_or_zero = np.nan_to_num(self.matrix[:, _RATING], nan=0.0)
+        self.has_spend = ~np.isnan(self.matrix[:, _MIN_SPEND]) & ~np.isnan(self.matrix[:, _MAX_SPEND])
+
+        self.bits = {col: df[bits_col].to_numpy() for col, bits_col in TAG_COLUMNS.items()}
+        self.tag_bits = df.attrs.get("tag_bits", {})
+        self.flag_bits = df["flag_bits"].to_numpy()
+        self.open_min = df["open_min"].to_numpy()
+        self.close_min = df["close_min"].to_numpy()
+
+        # tie-break keys: higher rating first, then name A-Z
+        self.rating_desc = -self.rating_or_zero
+        names = df["name"].astype(str).str.casefold().to_numpy()
+        self.name_rank = pd.factorize(names, sort=True)[0]
+
+        codes, categories = pd.factorize(df["location"])
+        self.location_codes = codes
+        self.location_names = [str(c).lower() for c in categories]
+
+        # only needed for the rare overflow-bit string fallback
+        self._df = weakref.ref(df)
+
+    def tag_hits(self, column, terms):
+        """Bool array: rows with a `column` tag containing one of terms."""
+        mask, hits_overflow = vocab_mask(self.tag_bits.get(column, []), terms)
+        bits = self.bits[column]
+        if not hits_overflow:
+            return (bits & np.uint64(mask)) != 0
+
+        hits = (bits & np.uint64(mask & ~(1 << OVERFLOW_BIT))) != 0
+        shared = ((bits >> np.uint64(OVERFLOW_BIT)) & np.uint64(1)) == 1
+        df = self._df()
+        if df is not None and shared.any():
+            pattern = "|".join(re.escape(t) for t in terms if t)
+            text = df[column].to_numpy()[shared].astype(str)
+            hits[shared] |= pd.Series(text).str.contains(pattern, case=False).to_numpy(dtype=bool)
+        return hits
+
+    def flag_hits(self, flag):
+        return (self.flag_bits & flag) != 0
+
+    def location_hits(self, term):
+        term = term.lower()
+        per_code = np.array([term in name for name in self.location_names] + [False])
+        return per_code[self.location_codes]
+
+    def open_rows(self, only_open_today=True, open_at_time=None, today=None):
+        """Bool array of rows that pass the opening-time filter."""
+        if open_at_time is not None:
+            return open_mask(
+                self.bits["days"], self.tag_bits.get("days", []),
+                self.open_min, self.close_min, open_at_time,
+            )
+        if only_open_today:
+            today = today or DAY_NAMES[datetime.today().weekday()]
+            return self.tag_hits("days", [today])
+        return np.ones(self.n, dtype=bool)
+
+    def open_among(self, positions, when):
+        """open_rows(open_at_time=when), evaluated only at `positions`."""
+        return open_mask(
+            self.bits["days"][positions], self.tag_bits.get("days", []),
+            self.open_min[positions], self.close_min[positions], when,
+        )
+
+    def open_in_hour(self, when):
+        """
+        Bool array of rows open at some minute of `when`'s clock hour: open
+        at the top of the hour, or listed for that day and opening during it.
+        Every row open_rows(open_at_time=...) returns within that hour is in here.
+        """
+        start = when.replace(minute=0, second=0, microsecond=0)
+        first_minute = start.hour * 60
+        opens_in_hour = (self.open_min >= first_minute) & (self.open_min < first_minute + 60)
+        today = self.tag_hits("days", [DAY_NAMES[start.weekday()]])
+        return self.open_rows(open_at_time=start) | (today & opens_in_hour)
+
+
+_features_cache = {}  # id(df) -> (weakref to df, CatalogFeatures)
+
+
+def features_for(df):
+    """CatalogFeatures for df, reused for as long as df is alive."""
+    key = id(df)
+    hit = _features_cache.get(key)
+    if hit is not None and hit[0]() is df:
+        return hit[1]
+    features = CatalogFeatures(df)
+    ref = weakref.ref(df, lambda _, key=key: _features_cache.pop(key, None))
+    _features_cache[key] = (ref, features)
+    return features
+
+
+def _tag_hits_batch(features, column, term_lists, rows):
+    """(N, len(rows)) bool: for each query, rows with a tag containing one of its terms."""
+    vocab = features.tag_bits.get(column, [])
+    masks = [vocab_mask(vocab, terms) if terms else (0, False) for terms in term_lists]
+    query_bits = np.array([m for m, _ in masks], dtype=np.uint64)
+    hits = (features.bits[column][rows][None, :] & query_bits[:, None]) != 0
+    for i, (_, hits_overflow) in enumerate(masks):
+        if hits_overflow:
+            hits[i] = features.tag_hits(column, term_lists[i])[rows]
+    return hits
+
+
+def preference_key(preferences):
+    """
+    Hashable canonical form of a preference dict: two dicts with the same
+    key always score identically. Mirrors the unpacking in
+    score_components_batch, so keep the two in step.
+    """
+    cuisine_pref = preferences.get("cuisine") or ""
+    cuisine_list = preferences.get("cuisines") or []
+    meal_type = preferences.get("meal_type") or ""
+    location_pref = preferences.get("location_pref") or ""
+    max_budget = preferences.get("max_budget")
+    max_travel = preferences.get("max_travel")
+    return (
+        tuple(sorted(set(cuisine_list or ([cuisine_pref] if cuisine_pref else [])))),
+        any(c.lower() == "dessert" for c in cuisine_list) or "dessert" in cuisine_pref.lower(),
+        meal_type if meal_type.lower() != "any" else "",
+        location_pref if location_pref.lower() != "any" else "",
+        (preferences.get("halal_pref") or "").lower() == "halal only",
+        preferences.get("budget_level") == "expensive",
+        None if max_budget is None else float(max_budget),
+        None if max_travel is None else float(max_travel),
+    )
+
+
+def score_components_batch(features, preferences_list, rows=None):
+    """
+    Score N preference dicts against the catalog in one pass.
+    Returns a (len(COMPONENTS), N, len(rows)) float32 array: one
+    queries x restaurants matrix per aspect. rows defaults to every row.
+    """
+    rows = np.arange(features.n) if rows is None else rows
+    n_queries = len(preferences_list)
+    comps = np.zeros((len(COMPONENTS), n_queries, len(rows)), dtype=np.float32)
+
+    min_spend = features.matrix[rows, _MIN_SPEND]
+    max_spend = features.matrix[rows, _MAX_SPEND]
+    travel = features.matrix[rows, _TRAVEL]
+    valid = features.has_spend[rows]
+    flag_bits = features.flag_bits[rows]
+    is_dessert_only = (flag_bits & FLAG_DESSERT_ONLY) != 0
+    is_halal = (flag_bits & FLAG_HALAL) != 0
+    is_inside = (flag_bits & FLAG_INSIDE_UTP) != 0
+
+    # unpack user preferences into one array per parameter
+    cuisine_terms, meal_terms, location_prefs = [], [], []
+    wants_dessert_penalty = np.zeros(n_queries, dtype=bool)
+    wants_halal = np.zeros(n_queries, dtype=bool)
+    wants_expensive = np.zeros(n_queries, dtype=bool)
+    max_budget = np.full(n_queries, np.nan)
+    max_travel = np.full(n_queries, np.nan)
+    for i, preferences in enumerate(preferences_list):
+        cuisine_pref = preferences.get("cuisine") or ""
+        cuisine_list = preferences.get("cuisines") or []
+        meal_type = preferences.get("meal_type") or ""
+        halal_pref = preferences.get("halal_pref") or ""
+        location_pref = preferences.get("location_pref") or ""
+        user_wants_dessert = any(
+            c.lower() == "dessert" for c in cuisine_list
+        ) or ("dessert" in cuisine_pref.lower())
+
+        cuisine_terms.append(cuisine_list or ([cuisine_pref] if cuisine_pref else []))
+        meal_terms.append([meal_type] if meal_type and meal_type.lower() != "any" else [])
+        location_prefs.append(location_pref if location_pref and location_pref.lower() != "any" else "")
+        wants_dessert_penalty[i] = not user_wants_dessert and meal_type in ["Breakfast", "Lunch", "Dinner"]
+        wants_halal[i] = halal_pref.lower() == "halal only"
+        wants_expensive[i] = preferences.get("budget_level") == "expensive"
+        if preferences.get("max_budget") is not None:
+            max_budget[i] = preferences["max_budget"]
+        if preferences.get("max_travel") is not None:
+            max_travel[i] = preferences["max_travel"]
+
+    # cuisine
+    comps[_CUISINE] += 40 * _tag_hits_batch(features, "cuisine", cuisine_terms, rows)
+    comps[_CUISINE] -= 25 * (wants_dessert_penalty[:, None] & is_dessert_only[None, :])
+
+    # budget tiers: fully in budget / cheapest item affordable / over budget
+    has_budget = ~np.isnan(max_budget)[:, None]
+    budget = max_budget[:, None]
+    fully = valid & (max_spend <= budget)
+    partially = valid & ~fully & (min_spend <= budget)
+    over = valid & ~fully & ~partially & has_budget
+    comps[_BUDGET] += 30 * fully + 15 * partially - 10 * over
+    # under budget penalty when the user asked for something expensive
+    expensive = (wants_expensive & ~np.isnan(max_budget))[:, None]
+    very_cheap = valid & (max_spend <= budget * 0.5)
+    mid_price = valid & ~very_cheap & (max_spend <= budget * 0.8)
+    comps[_BUDGET] -= 20 * (very_cheap & expensive) + 5 * (mid_price & expensive)
+
+    # meal type
+    comps[_MEAL] += 15 * _tag_hits_batch(features, "dining_tag", meal_terms, rows)
+
+    # travel (NaN max_travel compares False)
+    comps[_TRAVEL_SCORE] += 10 * (travel <= max_travel[:, None])
+
+    # halal
+    comps[_HALAL] += np.where(wants_halal[:, None], np.where(is_halal, 10, -20), 0)
+
+    # location: score each distinct preference once, then gather per query
+    distinct = sorted(set(location_prefs))
+    table = np.zeros((len(distinct), len(rows)), dtype=np.float32)
+    for j, location_pref in enumerate(distinct):
+        if location_pref == "Outside UTP":
+            table[j] = np.where(is_inside, -10, 20)
+        elif location_pref == "Inside UTP":
+            table[j] = np.where(is_inside, 20, -10)
+        elif location_pref:
+            table[j] = 30 * features.location_hits(location_pref)[rows]
+    comps[_LOCATION] = table[[distinct.index(p) for p in location_prefs]]
+
+    # rating
+    comps[_RATING_SCORE] = features.rating_or_zero[rows] * 2
+    return comps
+
+
+def _ordered(features, rows, totals):
+    """Indices into rows/totals: score desc, then rating desc, then name."""
+    return np.lexsort((features.name_rank[rows], features.rating_desc[rows], -totals))
+
+
+def select_top(features, rows, totals, k):
+    """
+    Indices of the k best entries of totals (see _ordered for ties) without
+    sorting all of them: argpartition finds the k-th best score, then only
+    rows scoring at least that much are sorted.
+    """
+    if k is None or k >= len(totals):
+        return _ordered(features, rows, totals)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = -np.partition(-totals, k - 1)[k - 1]
+    candidates = np.flatnonzero(totals >= kth)  # keeps every row tied with the k-th
+    return candidates[_ordered(features, rows[candidates], totals[candidates])][:k]
+
+
+def rank(features, preferences, only_open_today=True, open_at_time=None, today=None, k=None, rows=None):
+    """
+    Score every open row. Returns (positions, totals, components) ordered
+    best first, ties broken by rating then name; k keeps only the top k.
+    components is (len(positions), len(COMPONENTS)).
+    rows: explicit row positions to rank instead of the opening-time filter.
+    """
+    return rank_batch(features, [preferences], k, only_open_today, open_at_time, today, rows)[0]
+
+
+# cap on queries x rows x components cells scored at once (~64 MB of float32)
+BATCH_CELLS = 16_000_000
+
+
+def rank_batch(features, preferences_list, k=None, only_open_today=True, open_at_time=None, today=None, rows=None):
+    """
+    rank() for many preference dicts at once. Queries are scored in chunks
+    of a queries x restaurants matrix per aspect, and each query keeps its
+    own top k. Returns a list of (positions, totals, components).
+    """
+    if rows is None:
+        rows = np.flatnonzero(features.open_rows(only_open_today, open_at_time, today))
+    chunk = max(1, BATCH_CELLS // max(1, len(rows) * len(COMPONENTS)))
+
+    results = []
+    for start in range(0, len(preferences_list), chunk):
+        comps = score_components_batch(features, preferences_list[start:start + chunk], rows)
+        totals = comps.sum(axis=0)
+        for q in range(totals.shape[0]):
+            order = select_top(features, rows, totals[q], k)
+            results.append((rows[order], totals[q, order], comps[:, q, order].T))
+    return results
+
+
+def ranked_frame(df, positions, totals, comps):
+    """The ranked rows of df with score and score_<component> columns."""
+    scores = {"score": totals}
+    scores.update({f"score_{name}": comps[:, i] for i, name in enumerate(COMPONENTS)})
+    return df.iloc[positions].assign(**scores)
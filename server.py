@@ -0,0 +1,259 @@
+# server.py
+
+"""
+Headless HTTP front end for the one-shot recommender (stdlib asyncio only).
+
+    POST /recommend  {"text": "cheap halal mamak inside utp", "k": 3}
+        -> {"prefs": {...}, "results": [...]}
+    POST /score      {"prefs": {...parse_one_shot output...}, "k": 3}
+        -> {"results": [...]}
+    GET  /health     -> {"status": "ok", "catalog": {version, reload_ms, ...}, "ranking_cache": {...},
+                         "timings": {stage: {count, p50_ms, ...}}}  (MAKANSINI_TIMINGS=1)
+
+Optional body fields: "k", "only_open_today" (default true) and "open_at"
+(ISO datetime; only rows open at that time are kept). Parsing and scoring
+run in a bounded thread pool so the event loop only does I/O; when every
+slot is taken requests get 503 instead of piling up. MAKANSINI_PROFILE=0.01
+writes a cProfile capture of 1% of requests (see profiling.py).
+
+    python server.py --port 8080
+    curl -d '{"text": "korean dinner under rm20"}' localhost:8080/recommend
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+
+import profiling
+import ranking_cache
+import timings
+from catalog import reload_stats, watch_catalog
+from engine import MAX_RESULTS, parse_one_shot, top_k_records, warm_up
+
+MAX_K = 100
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+READ_TIMEOUT_S = 30
+
+WORKERS = 4
+QUEUE_PER_WORKER = 8  # requests waiting for a worker before we answer 503
+
+PREF_NUMBERS = ("max_budget", "max_travel")
+PREF_STRINGS = ("cuisine", "budget_level", "meal_type", "halal_pref", "location_pref")
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==========================
+# Engine (runs in the executor)
+# ==========================
+
+def recommend(text, **options):
+    with profiling.profile_turn("recommend"), timings.turn("recommend"):
+        prefs = parse_one_shot(text)
+        return {"prefs": prefs, "results": top_k_records(prefs, **options)}
+
+
+def score(prefs, **options):
+    with profiling.profile_turn("score"), timings.turn("score"):
+        return {"results": top_k_records(prefs, **options)}
+
+
+# ==========================
+# Request validation
+# ==========================
+
+def _options(body):
+    k = body.get("k", MAX_RESULTS)
+    if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_K:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"'k' must be an integer from 1 to {MAX_K}")
+    only_open_today = body.get("only_open_today", True)
+    if not isinstance(only_open_today, bool):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'only_open_today' must be true or false")
+    open_at_time = body.get("open_at")
+    if open_at_time is not None:
+        try:
+            open_at_time = datetime.fromisoformat(open_at_time)
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'open_at' must be an ISO datetime") from None
+    return {"k": k, "only_open_today": only_open_today, "open_at_time": open_at_time}
+
+
+def _prefs(prefs):
+    if not isinstance(prefs, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'prefs' must be an object")
+    for key in PREF_NUMBERS:
+        value = prefs.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'prefs.{key}' must be a number or null")
+    for key in PREF_STRINGS:
+        value = prefs.get(key)
+        if value is not None and not isinstance(value, str):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'prefs.{key}' must be a string or null")
+    cuisines = prefs.get("cuisines") or []
+    if not isinstance(cuisines, list) or not all(isinstance(c, str) for c in cuisines):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'prefs.cuisines' must be a list of strings")
+    return prefs
+
+
+def route(method, path, body):
+    """-> (handler, args, options) for the executor, or raise RequestError."""
+    if path == "/recommend":
+        if method != "POST":
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, "use POST")
+        text = body.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'text' must be a non-empty string")
+        return recommend, (text,), _options(body)
+    if path == "/score":
+        if method != "POST":
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, "use POST")
+        return score, (_prefs(body.get("prefs")),), _options(body)
+    raise RequestError(HTTPStatus.NOT_FOUND, f"no route for {path}")
+
+
+# ==========================
+# HTTP plumbing
+# ==========================
+
+async def read_request(reader):
+    """-> (method, path, headers, body bytes), or None when the client hung up."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many headers")
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "bad Content-Length") from None
+    if length > MAX_BODY_BYTES:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def write_response(writer, status, payload, keep_alive):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + data)
+
+
+class RecommendServer:
+    """asyncio HTTP/1.1 server (keep-alive, JSON bodies) over engine.py."""
+
+    def __init__(self, workers=WORKERS, queue_per_worker=QUEUE_PER_WORKER):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="makansini")
+        self.slots = asyncio.Semaphore(workers * (1 + queue_per_worker))
+
+    async def dispatch(self, method, path, body):
+        if path == "/health" and method == "GET":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "catalog": reload_stats(),
+                "ranking_cache": ranking_cache.cache_stats(),
+                "timings": timings.percentiles(),
+            }
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+        handler, args, options = route(method, path, payload)
+
+        if self.slots.locked():
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry shortly")
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, lambda: handler(*args, **options))
+        return HTTPStatus.OK, result
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await asyncio.wait_for(read_request(reader), READ_TIMEOUT_S)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload = await self.dispatch(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:  # keep serving; report the failure to this client
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(e)}
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        # load the catalog and build the matchers before taking traffic;
+        # later CSV edits are picked up by the catalog watcher thread
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, watch_catalog)
+        await loop.run_in_executor(self.executor, warm_up)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+async def serve(host, port, workers):
+    app = RecommendServer(workers)
+    server = await app.start(host, port)
+    print(f"listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="scoring threads")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# snapshot.py
+
+"""
+Columnar snapshot of the restaurant catalog.
+
+`python snapshot.py [csv ...]` compiles a survey CSV (either export layout) into a directory of .npy
+columns plus a small string table (meta.json). Numeric columns are saved
+as-is. Text columns with few distinct values are saved as categorical
+codes whose categories live in the string table; near-unique ones (`name`,
+`submitted`) as UTF-8 bytes plus offsets and a validity bitmap, the Arrow
+string layout.
+
+Loading opens every file with mmap_mode="r" and wraps it without copying
+or validating (the format, schema and source stamp were already checked):
+categoricals via from_codes(validate=False), strings as Arrow-backed str
+columns over the mapped buffers. So the load cost stays flat as the
+catalog grows, and several workers on one host share the same page-cache
+pages instead of each parsing a private copy. Without pyarrow, string
+columns are decoded instead, which is linear in the rows.
+"""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_SUFFIX = ".snapshot"
+FORMAT_VERSION = 2
+META_FILE = "meta.json"
+# text columns with more distinct values than this share of the rows are
+# stored as strings; their category table would be as big as the column
+NEAR_UNIQUE = 0.5
+
+
+def snapshot_dir_for(csv_path):
+    """<csv name>.snapshot, next to the CSV it was compiled from."""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + SNAPSHOT_SUFFIX)
+
+
+def file_stamp(path):
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def write_snapshot(df, snapshot_dir, source_stamp=None, schema=None):
+    """
+    Write df as one .npy file per column. The new snapshot is built in a
+    temp directory and renamed into place, so readers never see half of it.
+    `schema` tags the normalizer version that produced df.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    tmp_dir = snapshot_dir.with_name(f"{snapshot_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    attrs = df.attrs
+    df = df.reset_index(drop=True)
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            np.save(tmp_dir / f"{i:03d}.npy", series.to_numpy())
+            columns.append({"name": name, "kind": "numeric"})
+        else:
+            cat = series.astype("category").array
+            if len(cat.categories) > NEAR_UNIQUE * len(df):
+                columns.append({"name": name, "kind": "string", "bytes": _save_strings(tmp_dir, i, series)})
+                continue
+            np.save(tmp_dir / f"{i:03d}.npy", cat.codes)
+            columns.append({
+                "name": name,
+                "kind": "category",
+                "categories": [str(c) for c in cat.categories],
+            })
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "rows": len(df),
+        "source_stamp": list(source_stamp) if source_stamp else None,
+        "schema": schema,
+        "attrs": attrs,
+        "columns": columns,
+    }
+    (tmp_dir / META_FILE).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    # swap in the new snapshot; processes that still map the old files keep them
+    old_dir = snapshot_dir.with_name(f"{snapshot_dir.name}.old-{os.getpid()}")
+    if snapshot_dir.exists():
+        snapshot_dir.rename(old_dir)
+    tmp_dir.rename(snapshot_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return snapshot_dir
+
+
+def _save_strings(snapshot_dir, i, series):
+    """Write one text column as Arrow-layout offsets/bytes/validity; returns the byte count."""
+    values = series.to_numpy(dtype=object)
+    valid = pd.notna(values)
+    encoded = [str(v).encode("utf-8") if ok else b"" for v, ok in zip(values, valid)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    np.save(snapshot_dir / f"{i:03d}.offsets.npy", offsets)
+    np.save(snapshot_dir / f"{i:03d}.bytes.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(snapshot_dir / f"{i:03d}.valid.npy", np.packbits(valid, bitorder="little"))
+    return int(offsets[-1])
+
+
+def _load_strings(snapshot_dir, i, rows, n_bytes, mmap_mode):
+    offsets = np.load(snapshot_dir / f"{i:03d}.offsets.npy", mmap_mode=mmap_mode)
+    data = np.load(snapshot_dir / f"{i:03d}.bytes.npy", mmap_mode=mmap_mode if n_bytes else None)
+    valid = np.load(snapshot_dir / f"{i:03d}.valid.npy", mmap_mode=mmap_mode)
+    try:
+        import pyarrow as pa
+    except ImportError:
+        blob = data.tobytes()
+        mask = np.unpackbits(valid, count=rows, bitorder="little").astype(bool)
+        values = [blob[offsets[j]:offsets[j + 1]].decode("utf-8") if mask[j] else None for j in range(rows)]
+        return pd.array(values, dtype="str")
+    arr = pa.LargeStringArray.from_buffers(rows, pa.py_buffer(offsets), pa.py_buffer(data), pa.py_buffer(valid))
+    return pd.array(arr, dtype=pd.StringDtype("pyarrow", na_value=np.nan))
+
+
+def read_snapshot(snapshot_dir, source_stamp=None, schema=None):
+    """
+    Open a snapshot with memory-mapped columns.
+    Returns None if there is no snapshot, it is from another format or
+    schema version, or it was compiled from a different version of the
+    source file.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    try:
+        meta = json.loads((snapshot_dir / META_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("format") != FORMAT_VERSION or meta.get("schema") != schema:
+        return None
+    if source_stamp is not None and meta.get("source_stamp") != list(source_stamp):
+        return None
+
+    # numpy cannot mmap a zero-length file
+    mmap_mode = "r" if meta["rows"] else None
+
+    columns = {}
+    for i, col in enumerate(meta["columns"]):
+        if col["kind"] == "string":
+            columns[col["name"]] = _load_strings(snapshot_dir, i, meta["rows"], col["bytes"], mmap_mode)
+            continue
+        arr = np.load(snapshot_dir / f"{i:03d}.npy", mmap_mode=mmap_mode)
+        if col["kind"] == "category":
+            # the stamp check above vouches for the codes
+            columns[col["name"]] = pd.Categorical.from_codes(arr, col["categories"], validate=False)
+        else:
+            columns[col["name"]] = arr
+    df = pd.DataFrame(columns, copy=False)
+    df.attrs.update(meta.get("attrs") or {})
+    return df
+
+
+def compile_snapshot(csv_path, read_csv, schema=None):
+    """Parse csv_path with read_csv and write its snapshot next to it."""
+    df = read_csv(csv_path)
+    return write_snapshot(df, snapshot_dir_for(csv_path), file_stamp(csv_path), schema)
+
+
+if __name__ == "__main__":
+    from catalog import CSV_FILE, SCHEMA_VERSION, read_catalog, resolve_path
+
+    targets = sys.argv[1:] or [resolve_path(CSV_FILE)]
+    for target in targets:
+        out = compile_snapshot(target, read_catalog, SCHEMA_VERSION)
+        print(f"compiled {target} -> {out}")
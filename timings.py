@@ -0,0 +1,159 @@
+# timings.py
+
+"""
+Per-stage latency timers.
+
+    with timings.stage("catalog_load"):
+        ...
+
+    @timings.timed("parse.pick_budget")
+    def pick_budget(...): ...
+
+Every stage keeps its last WINDOW durations, so percentiles() gives a
+rolling p50/p95/p99 per stage. Stages recorded inside `with turn():`
+are also summed per turn and logged as one JSON line on the
+"makansini.timings" logger when the turn ends.
+
+Off unless MAKANSINI_TIMINGS=1 or enable() is called. While off, stage()
+hands back one shared no-op context manager and timed() wrappers call
+straight through, so the instrumentation costs a flag check.
+Stdlib only: engine.py imports this at start-up.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+WINDOW = 1024  # durations kept per stage
+PERCENTILES = (50, 95, 99)
+
+_enabled = os.environ.get("MAKANSINI_TIMINGS", "") not in ("", "0")
+_windows = {}  # stage -> deque of ms
+_windows_lock = threading.Lock()
+_current = threading.local()  # .stages: {stage: ms} of the turn in progress
+_NOOP = nullcontext()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def record(name, ms):
+    window = _windows.get(name)
+    if window is None:
+        with _windows_lock:
+            window = _windows.setdefault(name, deque(maxlen=WINDOW))
+    window.append(ms)
+    stages = getattr(_current, "stages", None)
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + ms
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def stage(name):
+    """Context manager timing its block as `name` (a no-op while disabled)."""
+    return _Stage(name) if _enabled else _NOOP
+
+
+def timed(name):
+    """Decorator: time every call of the function as stage `name`."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        # profilers key functions on their code object; without this every
+        # timed function would show up as the same "wrapper"
+        wrapper.__code__ = wrapper.__code__.replace(co_name=fn.__name__, co_qualname=f"timed({fn.__qualname__})")
+        return wrapper
+    return decorate
+
+
+class turn:
+    """
+    Collect the stages of one request / chat turn; on exit record the
+    total as stage `name` and log every stage of the turn as JSON.
+    """
+
+    def __init__(self, name="turn", **fields):
+        self.name = name
+        self.fields = fields
+        self.active = False
+
+    def __enter__(self):
+        self.active = _enabled and getattr(_current, "stages", None) is None
+        if self.active:
+            _current.stages = {}
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.active:
+            return False
+        total_ms = (time.perf_counter() - self.started) * 1000
+        stages, _current.stages = _current.stages, None
+        record(self.name, total_ms)
+        _log({
+            "event": "timings", "turn": self.name, "total_ms": round(total_ms, 3),
+            "stages": {k: round(v, 3) for k, v in stages.items()}, **self.fields,
+        })
+        return False
+
+
+def _log(payload):
+    import logging
+    log = logging.getLogger("makansini.timings")
+    if log.level == logging.NOTSET:
+        # nobody configured it: print the lines rather than drop them
+        log.setLevel(logging.INFO)
+        if not log.hasHandlers():
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            log.addHandler(handler)
+    log.info(json.dumps(payload))
+
+
+def _percentile(ordered, p):
+    # nearest rank
+    return ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
+
+
+def percentiles():
+    """{stage: {"count", "p50_ms", "p95_ms", "p99_ms"}} over each rolling window."""
+    with _windows_lock:
+        snapshot = {name: sorted(window) for name, window in _windows.items()}
+    return {
+        name: {"count": len(ms), **{f"p{p}_ms": _percentile(ms, p) for p in PERCENTILES}}
+        for name, ms in sorted(snapshot.items())
+        if ms
+    }
+
+
+def reset():
+    with _windows_lock:
+        _windows.clear()